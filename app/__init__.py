@@ -0,0 +1,11 @@
+# app/__init__.py
+import os
+
+from dotenv import load_dotenv
+
+# "production" reads settings only from the real environment (no .env lookup);
+# must be set outside .env. Loaded here, before any app module is imported,
+# because modules read their settings from os.environ at import time.
+APP_ENV = os.getenv("APP_ENV", "development").lower()
+if APP_ENV != "production":
+    load_dotenv()
\ No newline at end of file
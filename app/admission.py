@@ -0,0 +1,176 @@
+# app/admission.py
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from fastapi import Depends, HTTPException, status
+from starlette.responses import JSONResponse
+
+from . import auth, metrics
+from .cache import TTLCache
+
+# Concurrent requests per route group (0 = unlimited). Beyond that, up to
+# ADMISSION_QUEUE_LIMIT requests wait at most ADMISSION_QUEUE_TIMEOUT_SECONDS
+# for a slot; everything else gets an immediate 503 with Retry-After.
+ADMISSION_AUTH_CONCURRENCY = int(os.getenv("ADMISSION_AUTH_CONCURRENCY", "0"))
+ADMISSION_READ_CONCURRENCY = int(os.getenv("ADMISSION_READ_CONCURRENCY", "0"))
+ADMISSION_WRITE_CONCURRENCY = int(os.getenv("ADMISSION_WRITE_CONCURRENCY", "0"))
+ADMISSION_QUEUE_LIMIT = int(os.getenv("ADMISSION_QUEUE_LIMIT", "50"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1.0"))
+
+# Per-user token bucket: sustained requests/second and burst size (0 = off)
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))
+RATE_LIMIT_MAX_USERS = int(os.getenv("RATE_LIMIT_MAX_USERS", "100000"))
+
+
+class Overloaded(Exception):
+    """Raised when a route group has no free slot and no room (or time) left to wait."""
+
+
+class Limiter:
+    """At most `concurrency` holders; up to `queue_limit` more wait, FIFO, for `timeout` seconds."""
+
+    def __init__(self, name: str, concurrency: int, queue_limit: int, timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_limit:
+            raise Overloaded(f"Too many {self.name} requests in progress")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise Overloaded(f"Timed out waiting for a {self.name} slot")
+
+    def release(self) -> None:
+        # Hand the slot straight to the oldest waiter so newcomers can't jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+
+def _limiter(name: str, concurrency: int) -> Optional[Limiter]:
+    if concurrency <= 0:
+        return None
+    return Limiter(name, concurrency, ADMISSION_QUEUE_LIMIT, ADMISSION_QUEUE_TIMEOUT_SECONDS)
+
+
+limiters: Dict[str, Optional[Limiter]] = {
+    "auth": _limiter("auth", ADMISSION_AUTH_CONCURRENCY),
+    "read": _limiter("read", ADMISSION_READ_CONCURRENCY),
+    "write": _limiter("write", ADMISSION_WRITE_CONCURRENCY),
+}
+
+
+def route_group(method: str, path: str) -> Optional[str]:
+    if not path.startswith("/api/v1/") or method == "OPTIONS":
+        return None
+    if path.startswith("/api/v1/auth/"):
+        return "auth"
+    return "read" if method in ("GET", "HEAD") else "write"
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware that sheds load per route group before any DB work starts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        group = route_group(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        limiter = limiters.get(group) if group else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            metrics.ADMISSION_REJECTED.inc(group=group)
+            retry_after = max(1, math.ceil(limiter.timeout))
+            response = JSONResponse(
+                {"detail": str(e)},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        metrics.ADMISSION_ACTIVE.inc(group=group)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            metrics.ADMISSION_ACTIVE.dec(group=group)
+            limiter.release()
+
+
+# ---- Per-user rate limit ----
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success, otherwise seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+# An idle bucket refills completely within burst/rate seconds, so older ones can go
+_buckets = TTLCache(
+    maxsize=RATE_LIMIT_MAX_USERS,
+    ttl=RATE_LIMIT_BURST / RATE_LIMIT_PER_SECOND if RATE_LIMIT_PER_SECOND > 0 else 0,
+)
+
+
+async def rate_limit(current_user=Depends(auth.get_current_user)):
+    """Router dependency: 429 with Retry-After once a user exceeds RATE_LIMIT_PER_SECOND."""
+    if RATE_LIMIT_PER_SECOND <= 0:
+        return
+    bucket = _buckets.get(current_user.id)
+    if bucket is None:
+        bucket = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+    # Re-set on every request so active users' buckets don't expire mid-use
+    _buckets.set(current_user.id, bucket)
+    wait = bucket.take()
+    if wait:
+        metrics.RATE_LIMITED.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
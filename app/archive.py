@@ -0,0 +1,135 @@
+# app/archive.py
+"""Moves returned loans out of `borrow_records` into `borrow_records_archive`.
+
+    python -m app.archive --after-days 365
+
+runs one pass now. In the app, a background task does the same every
+ARCHIVE_INTERVAL_SECONDS, so the hot table holds open and recent loans only.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import delete, func, insert, select, text
+
+from . import metrics, models
+from .database import AsyncSessionLocal
+
+# Seconds between archive passes; 0 disables the background task
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+# Loans returned more than this many days ago are archived
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+# Loans moved per transaction, so no pass holds locks for long
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger("app.archive")
+
+_task: Optional[asyncio.Task] = None
+# Years known to have a partition already, per process
+_partitions: Set[int] = set()
+
+
+async def _ensure_partitions(years: Iterable[int]) -> None:
+    """Create the yearly PostgreSQL partitions that archived rows will land in."""
+    missing = sorted(set(years) - _partitions)
+    if not missing:
+        return
+    async with AsyncSessionLocal() as db:
+        for year in missing:
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS borrow_records_archive_{year:d} "
+                f"PARTITION OF borrow_records_archive "
+                f"FOR VALUES FROM ('{year:d}-01-01') TO ('{year + 1:d}-01-01')"
+            ))
+        await db.commit()
+    _partitions.update(missing)
+
+
+async def archive_once(after_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archive every loan returned more than `after_days` ago; returns how many moved.
+
+    Each batch of `batch_size` is copied and deleted in one short transaction,
+    so a loan is always in exactly one of the two tables. Rows are locked
+    with SKIP LOCKED, so several workers can archive at once.
+    """
+    hot = models.BorrowRecord
+    cutoff = datetime.utcnow() - timedelta(days=after_days)
+    # NULL borrowed_at can't be partitioned by; such legacy rows stay hot
+    archivable = (hot.returned_at < cutoff, hot.borrowed_at.is_not(None))
+
+    async with AsyncSessionLocal() as db:
+        oldest = await db.scalar(select(func.min(hot.borrowed_at)).where(*archivable))
+        postgres = db.get_bind().dialect.name == "postgresql"
+    if oldest is None:
+        return 0
+    if postgres:
+        # borrowed_at <= returned_at < cutoff, so these years cover every candidate
+        await _ensure_partitions(range(oldest.year, cutoff.year + 1))
+
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.scalars(
+                select(hot.id)
+                .where(*archivable)
+                .order_by(hot.returned_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )).all()
+            moved = []
+            if ids:
+                result = await db.execute(
+                    delete(hot)
+                    .where(hot.id.in_(ids))
+                    .returning(*(getattr(hot, name) for name in models.BORROW_RECORD_COLUMNS))
+                    .execution_options(synchronize_session=False)
+                )
+                moved = [row._asdict() for row in result.all()]
+                await db.execute(insert(models.BorrowRecordArchive), moved)
+            await db.commit()
+        metrics.LOANS_ARCHIVED.inc(len(moved))
+        total += len(moved)
+        if len(ids) < batch_size:
+            return total
+        await asyncio.sleep(0)  # let requests run between batches
+
+
+async def _run(interval: float) -> None:
+    while True:
+        try:
+            moved = await archive_once()
+            if moved:
+                logger.info("archived %d returned loans", moved)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("loan archiving failed")
+        await asyncio.sleep(interval)
+
+
+def start(interval: float = ARCHIVE_INTERVAL_SECONDS) -> None:
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.create_task(_run(interval))
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--after-days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    print({"archived": asyncio.run(archive_once(args.after_days, args.batch_size))})
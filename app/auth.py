@@ -1,17 +1,30 @@
 # app/auth.py
+import asyncio
+import hmac
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from .security import verify_password
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
-from . import crud, schemas, database
+from . import crud, schemas, database, models, profiling, revocation
+from .cache import TTLCache
 from fastapi.security import OAuth2PasswordBearer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+logger = logging.getLogger("app.auth")
+
 # Password hashing
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -39,6 +52,12 @@ def verify_password(plain: str, hashed: str) -> bool:
 SECRET_KEY = "your-super-secret-jwt-key-here-change-in-prod"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Refresh tokens are single-use: each /auth/refresh rotates it for a new one
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+# `type` claim values; tokens issued before it existed count as access tokens
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -46,12 +65,93 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+# Hashing is CPU-bound (tens of ms), so it runs on a small thread pool instead of
+# the event loop; bcrypt and argon2 release the GIL while they work. Once
+# HASH_POOL_SIZE jobs are running and HASH_QUEUE_LIMIT more are waiting, new
+# work is rejected rather than queued without bound.
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", "4"))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "64"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_POOL_SIZE, thread_name_prefix="pwhash")
+_hash_jobs = 0
+_hash_jobs_lock = threading.Lock()
+
+
+class HashingBusyError(Exception):
+    """Raised when the password hashing pool is saturated."""
+
+
+async def _run_hash_job(fn, *args):
+    global _hash_jobs
+    if _hash_jobs >= HASH_POOL_SIZE + HASH_QUEUE_LIMIT:
+        raise HashingBusyError("Too many password operations in progress, try again shortly")
+    with _hash_jobs_lock:
+        _hash_jobs += 1
+    job = _hash_executor.submit(fn, *args)
+    # Free the slot when the job itself is done, not when the caller stops waiting:
+    # a cancelled (disconnected) request leaves its hash running on the pool.
+    # Runs on the worker thread, hence the lock.
+    job.add_done_callback(_release_hash_job)
+    return await asyncio.wrap_future(job)
+
+
+def _release_hash_job(job) -> None:
+    global _hash_jobs
+    with _hash_jobs_lock:
+        _hash_jobs -= 1
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+# Verified-token cache: skips JWT decoding and the user lookup on repeat requests.
+# Entries never outlive the token's `exp`, and are dropped when the user row changes.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached copy of the `User` columns that route handlers read."""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+
+def invalidate_user(user_id: int) -> None:
+    token_cache.discard_where(lambda token, user: user.id == user_id)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # ORM flushes only; bulk UPDATE statements must call invalidate_user() themselves
+    invalidate_user(target.id)
+
 
 async def authenticate_user(db: AsyncSession, username: str, password: str):
     user = await crud.get_user_by_username(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
@@ -65,10 +165,83 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(username: str, family: str) -> str:
+    # `fam` ties every token rotated from one login together, so they can be revoked at once
+    return create_access_token(
+        data={"sub": username, "type": REFRESH_TOKEN_TYPE, "jti": uuid.uuid4().hex, "fam": family},
+        expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+def issue_tokens(username: str, family: Optional[str] = None) -> dict:
+    """The `schemas.Token` body returned by login (new family) and refresh (same family)."""
+    access_token = create_access_token(
+        data={"sub": username, "type": ACCESS_TOKEN_TYPE},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    refresh_token = create_refresh_token(username, family or uuid.uuid4().hex)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+def _refresh_claims(token: str) -> Optional[dict]:
+    """The claims of a validly signed, unexpired refresh token, or None."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") != REFRESH_TOKEN_TYPE or not payload.get("sub") or not payload.get("jti"):
+        return None
+    if payload.get("exp") is None:
+        return None
+    # Tokens from before families existed are a family of their own
+    payload.setdefault("fam", payload["jti"])
+    return payload
+
+def _family_expiry() -> datetime:
+    # Every rotation issues a full lifetime, so no token of a family outlives this
+    return datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+async def redeem_refresh_token(db: AsyncSession, token: str) -> Optional[Tuple[models.User, str]]:
+    """Spend a refresh token: its active user and token family, or None if refused.
+
+    A signature check, a user lookup, a family lookup and one insert into the
+    revocation store; no password hashing. The token is only spent once it
+    passes the other checks. A token that was already spent means a copy is in
+    someone else's hands, so its whole family is revoked: whichever side
+    rotated it first loses the session as well.
+    """
+    claims = _refresh_claims(token)
+    if claims is None:
+        return None
+    user = await crud.get_user_by_username(db, claims["sub"])
+    if user is None or not user.is_active:
+        return None
+    family = claims["fam"]
+    if await revocation.family_revoked(db, family):
+        return None
+    if not await revocation.revoke(db, claims["jti"], datetime.utcfromtimestamp(claims["exp"])):
+        logger.warning("refresh token reused for %s; revoking its family", claims["sub"])
+        await revocation.revoke_family(db, family, _family_expiry())
+        return None
+    return user, family
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """Log out: revoke the family of a refresh token; False if it isn't a valid one.
+
+    Access tokens already issued stay valid until they expire.
+    """
+    claims = _refresh_claims(token)
+    if claims is None:
+        return False
+    await revocation.revoke_family(db, claims["fam"], _family_expiry())
+    return True
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(database.get_db)
 ):
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -79,10 +252,28 @@ async def get_current_user(
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
+        # Refresh tokens only buy new tokens; they never reach the cache below
+        if payload.get("type", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+            raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = await crud.get_user_by_username(db, username)
-    if user is None:
+    with profiling.phase_db("auth"):
+        user = await crud.get_user_by_username(db, username)
+    if user is None or not user.is_active:
         raise credentials_exception
-    return user
\ No newline at end of file
+
+    snapshot = UserSnapshot.from_user(user)
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(token, snapshot, ttl=exp - time.time())
+    return snapshot
+
+# Operators (staff tooling, not patrons) unlock endpoints that span every patron's
+# loans by also sending this shared secret as `X-Operator-Token`; unset = nobody can
+OPERATOR_TOKEN = os.getenv("OPERATOR_TOKEN")
+
+def is_operator(x_operator_token: Optional[str] = Header(None)) -> bool:
+    if not OPERATOR_TOKEN or x_operator_token is None:
+        return False
+    return hmac.compare_digest(x_operator_token.encode(), OPERATOR_TOKEN.encode())
\ No newline at end of file
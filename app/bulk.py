@@ -0,0 +1,138 @@
+# app/bulk.py
+import codecs
+import csv
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import schemas
+
+# Rows per multi-row INSERT (and per commit)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Failed rows beyond this are counted but not listed, so the report stays bounded
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+# Longest accepted line, in characters; longer ones are dropped as they stream in
+IMPORT_MAX_LINE_LENGTH = int(os.getenv("IMPORT_MAX_LINE_LENGTH", "65536"))
+
+Row = Tuple[int, dict]
+BatchWriter = Callable[[AsyncSession, List[Row]], Awaitable[List[Tuple[int, str]]]]
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int = IMPORT_MAX_LINE_LENGTH
+) -> AsyncIterator[Union[str, ValueError]]:
+    """Split a byte stream into text lines without buffering the whole body.
+
+    A line over `max_length` characters yields a ValueError in its place; its
+    text is discarded as it arrives, so a body without newlines can't grow
+    the buffer past `max_length` plus one chunk.
+    """
+    def too_long() -> ValueError:
+        return ValueError(f"Line longer than {max_length} characters")
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    skipping = False  # inside an oversized line whose end hasn't arrived yet
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if skipping or len(line) > max_length:
+                skipping = False
+                yield too_long()
+            else:
+                yield line.rstrip("\r")
+        if len(pending) > max_length:
+            skipping = True
+            pending = ""
+    pending += decoder.decode(b"", final=True)
+    if skipping or len(pending) > max_length:
+        yield too_long()
+    elif pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (line number, dict) per record; unparsable lines yield an exception instead.
+
+    CSV input needs a header row and one record per line; empty cells are left
+    out, so the schema's defaults apply to them.
+    """
+    is_csv = content_type.split(";")[0].strip().lower() == "text/csv"
+    header = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if isinstance(line, Exception):
+            yield line_no, line
+            continue
+        if not line.strip():
+            continue
+        if not is_csv:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_no, ValueError("Expected a JSON object")
+                continue
+            yield line_no, record
+            continue
+        try:
+            cells = next(csv.reader([line]))
+        except csv.Error as e:
+            yield line_no, ValueError(f"Invalid CSV: {e}")
+            continue
+        if header is None:
+            header = [name.strip() for name in cells]
+            continue
+        if len(cells) != len(header):
+            yield line_no, ValueError(f"Expected {len(header)} columns, got {len(cells)}")
+            continue
+        yield line_no, {name: value for name, value in zip(header, cells) if value != ""}
+
+
+async def run_import(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    schema: Type[BaseModel],
+    write_batch: BatchWriter,
+) -> schemas.ImportReport:
+    """Validate streamed rows against `schema` and hand them to `write_batch` in batches."""
+    report = schemas.ImportReport()
+
+    def fail(line_no: int, error: str):
+        report.failed += 1
+        if len(report.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(schemas.ImportRowError(line=line_no, error=error))
+
+    async def flush(batch: List[Row]):
+        failures = await write_batch(db, batch)
+        for line_no, error in failures:
+            fail(line_no, error)
+        report.inserted += len(batch) - len(failures)
+
+    batch: List[Row] = []
+    async for line_no, record in iter_records(chunks, content_type):
+        if isinstance(record, Exception):
+            fail(line_no, str(record))
+            continue
+        try:
+            values = schema.model_validate(record).model_dump()
+        except ValidationError as e:
+            fail(line_no, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        batch.append((line_no, values))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    return report
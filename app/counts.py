@@ -0,0 +1,104 @@
+# app/counts.py
+"""Total counts for book listings, cheap enough to send alongside a page.
+
+Each filter combination is answered by the cheapest source that fits it:
+the statistics counters (app/stats.py) when only author/availability filters
+are set, otherwise a count that stops at COUNT_EXACT_LIMIT rows, and above
+that PostgreSQL's planner estimate. Answers are cached per filter combination.
+"""
+import os
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models
+from .cache import TTLCache
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+
+# Result sets up to this size are counted exactly; larger ones may be estimated
+COUNT_EXACT_LIMIT = int(os.getenv("COUNT_EXACT_LIMIT", "1000"))
+# Cached totals may lag writes by up to the TTL
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "30"))
+
+_cache = TTLCache(maxsize=COUNT_CACHE_SIZE, ttl=COUNT_CACHE_TTL_SECONDS)
+
+
+class Total(NamedTuple):
+    count: int
+    exact: bool
+
+
+def headers(total: Total) -> Dict[str, str]:
+    return {
+        TOTAL_COUNT_HEADER: str(total.count),
+        TOTAL_COUNT_EXACT_HEADER: "true" if total.exact else "false",
+    }
+
+
+def from_page(skip: int, limit: int, cursor: Optional[str], returned: int) -> Optional[Total]:
+    """The total implied by an offset page that came back short, if there is one."""
+    if cursor or limit <= 0 or returned >= limit or (skip and not returned):
+        return None
+    return Total(skip + returned, True)
+
+
+async def _from_counters(db: AsyncSession, author_id: Optional[int], available: Optional[bool]) -> Optional[int]:
+    if author_id:
+        if available is not None:
+            return None  # per-author counters don't split by availability
+        books = await db.scalar(
+            select(models.AuthorBookCount.books).where(models.AuthorBookCount.author_id == author_id)
+        )
+        return books or 0
+    books, available_books = (await db.execute(select(
+        func.coalesce(func.sum(models.CatalogCounter.books), 0),
+        func.coalesce(func.sum(models.CatalogCounter.available_books), 0),
+    ))).one()
+    if available is None:
+        return books
+    return available_books if available else books - available_books
+
+
+async def book_total(
+    db: AsyncSession,
+    title: Optional[str] = None,
+    author_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    q: Optional[str] = None
+) -> Total:
+    # Normalized the way crud._filter_books reads the filters, so equivalent requests share an entry
+    q = q.strip() if q else None
+    key = ("books", title or None, author_id or None, available, q or None)
+    total = _cache.get(key)
+    if total is not None:
+        return total
+
+    count = None
+    if not title and not q:
+        count = await _from_counters(db, author_id, available)
+    if count is not None:
+        total = Total(count, True)
+    else:
+        count = await crud.count_books(
+            db, title=title, author_id=author_id, available=available, q=q, cap=COUNT_EXACT_LIMIT + 1
+        )
+        if count <= COUNT_EXACT_LIMIT:
+            total = Total(count, True)
+        elif db.get_bind().dialect.name == "postgresql":
+            estimate = await crud.estimate_books(db, title=title, author_id=author_id, available=available, q=q)
+            total = Total(max(estimate, count), False)
+        else:
+            # No planner statistics to ask; count in full and let the cache absorb it
+            total = Total(await crud.count_books(
+                db, title=title, author_id=author_id, available=available, q=q
+            ), True)
+    _cache.set(key, total)
+    return total
+
+
+def clear() -> None:
+    _cache.clear()
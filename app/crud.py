@@ -1,27 +1,48 @@
 # app/crud.py
+import json
 from sqlalchemy.future import select
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, tuple_, func, literal_column, table, column, insert, update, union_all
+from sqlalchemy import DateTime, Integer, bindparam
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 from .security import get_password_hash
-from typing import Optional, List
+from typing import Any, Callable, Dict, Hashable, Optional, List, Tuple
 from datetime import datetime, timedelta
-from . import models, schemas, auth
+from . import models, schemas, auth, http_cache, stats
+from .pagination import decode_cursor
+
+# ---- Statement cache ----
+# Hot statements are built once, with bindparam() placeholders for the values,
+# and reused. A reused statement object also keeps its memoized SQL cache key,
+# so neither construction nor cache-key generation runs per call; the engine's
+# compiled cache and (on asyncpg) the prepared-statement cache do the rest.
+_statements: Dict[Hashable, Any] = {}
+
+def _cached(key: Hashable, build: Callable[[], Any]):
+    """The statement for `key`, built on first use; for shapes chosen at runtime."""
+    statement = _statements.get(key)
+    if statement is None:
+        statement = _statements[key] = build()
+    return statement
 
 # ---- User ----
+_USER_BY_USERNAME = select(models.User).where(models.User.username == bindparam("username"))
+_USER_BY_EMAIL = select(models.User).where(models.User.email == bindparam("email"))
+
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[models.User]:
-    result = await db.execute(select(models.User).where(models.User.username == username))
+    result = await db.execute(_USER_BY_USERNAME, {"username": username})
     return result.scalars().first()
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
-    result = await db.execute(select(models.User).where(models.User.email == email))
+    result = await db.execute(_USER_BY_EMAIL, {"email": email})
     return result.scalars().first()
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.User:
     db_user = models.User(
         username=user.username,
         email=user.email,
-       hashed_password = auth.get_password_hash(user.password)
+       hashed_password = await auth.get_password_hash_async(user.password)
     )
     db.add(db_user)
     await db.commit()
@@ -44,49 +65,295 @@ async def get_author(db: AsyncSession, author_id: int) -> Optional[models.Author
     )
     return result.scalars().first()
 
-async def get_authors(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[models.Author]:
-    result = await db.execute(select(models.Author).offset(skip).limit(limit))
+# Columns for the lean list views, in response-schema field order
+AUTHOR_LIST_COLUMNS = {
+    "full": (models.Author.name, models.Author.bio, models.Author.birth_date, models.Author.id),
+    "summary": (models.Author.name, models.Author.birth_date, models.Author.id),
+}
+
+def _page_authors(query, skip: int, limit: int, cursor: Optional[str]):
+    query = query.order_by(models.Author.id)
+    if cursor:
+        # Keyset paging: seek past the last seen id instead of scanning `skip` rows
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.where(models.Author.id > last_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+async def get_authors(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> List[models.Author]:
+    result = await db.execute(_page_authors(select(models.Author), skip, limit, cursor))
     return result.scalars().all()
 
+async def get_author_rows(
+    db: AsyncSession,
+    columns,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> list:
+    """Like `get_authors`, but returns plain row tuples of `columns`."""
+    result = await db.execute(_page_authors(select(*columns), skip, limit, cursor))
+    return result.all()
+
+async def get_author_rows_by_ids(db: AsyncSession, columns, author_ids: List[int]) -> list:
+    """Rows of `columns` for the given authors, in no particular order."""
+    result = await db.execute(select(*columns).where(models.Author.id.in_(author_ids)))
+    return result.all()
+
+# ---- Bulk import ----
+async def bulk_create(db: AsyncSession, model, rows: List[Tuple[int, dict]]) -> List[Tuple[int, str]]:
+    """Insert `(line, values)` rows with one multi-row INSERT; the caller commits.
+
+    If the batch hits a constraint or a value the column can't hold (e.g. too
+    long for a PostgreSQL VARCHAR) it is retried row by row, each in its own
+    savepoint, so only the offending rows are rejected. Returns `(line, error)`
+    for every row that was not inserted.
+    """
+    failures = []
+    if rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(model), [values for _, values in rows])
+        except (IntegrityError, DataError):
+            for line, values in rows:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(model), [values])
+                except (IntegrityError, DataError) as e:
+                    failures.append((line, str(e.orig)))
+    return failures
+
+async def bulk_create_authors(db: AsyncSession, rows: List[Tuple[int, dict]]) -> List[Tuple[int, str]]:
+    failures = await bulk_create(db, models.Author, rows)
+    await db.commit()
+    return failures
+
+async def bulk_create_books(db: AsyncSession, rows: List[Tuple[int, dict]]) -> List[Tuple[int, str]]:
+    # Check author ids up front: SQLite does not enforce foreign keys by default
+    author_ids = {values["author_id"] for _, values in rows}
+    result = await db.execute(select(models.Author.id).where(models.Author.id.in_(author_ids)))
+    known = set(result.scalars().all())
+    failures = [(line, "Author not found") for line, values in rows if values["author_id"] not in known]
+    valid = [(line, values) for line, values in rows if values["author_id"] in known]
+    failed = await bulk_create(db, models.Book, valid)
+    failed_lines = {line for line, _ in failed}
+    inserted = [values for line, values in valid if line not in failed_lines]
+    await stats.record_books(
+        db,
+        books=len(inserted),
+        available=sum(1 for values in inserted if values.get("available", True)),
+    )
+    author_counts = {}
+    for values in inserted:
+        author_counts[values["author_id"]] = author_counts.get(values["author_id"], 0) + 1
+    await stats.record_authors(db, author_counts)
+    await db.commit()
+    http_cache.invalidate("author", known)
+    return failures + failed
+
 # ---- Book ----
 async def create_book(db: AsyncSession, book: schemas.BookCreate) -> models.Book:
     db_book = models.Book(**book.model_dump())
     db.add(db_book)
+    await db.flush()
+    await stats.record_books(db, books=1, available=int(db_book.available))
+    await stats.record_authors(db, {db_book.author_id: 1})
     await db.commit()
+    http_cache.invalidate_book(None, db_book.author_id)
     await db.refresh(db_book)
     return db_book
 
+_BOOK_BY_ID = select(models.Book).where(models.Book.id == bindparam("book_id"))
+_BOOK_DETAIL_BY_ID = _BOOK_BY_ID.options(joinedload(models.Book.author))
+
 async def get_book(db: AsyncSession, book_id: int) -> Optional[models.Book]:
-    result = await db.execute(select(models.Book).where(models.Book.id == book_id))
+    result = await db.execute(_BOOK_BY_ID, {"book_id": book_id})
+    return result.scalars().first()
+
+async def get_book_detail(db: AsyncSession, book_id: int) -> Optional[models.Book]:
+    """Book with its author, loaded in the same query."""
+    result = await db.execute(_BOOK_DETAIL_BY_ID, {"book_id": book_id})
     return result.scalars().first()
 
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input can't hit FTS5 query syntax errors
+    return " ".join('"%s"' % term.replace('"', '""') for term in q.split())
+
+def _apply_book_search(query, dialect: str, q: str):
+    """Filter `query` to books matching `q` in title/description, best match first."""
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery(literal_column("'english'"), q)
+        rank = func.ts_rank_cd(models.book_search_vector, ts_query)
+        return (
+            query.where(models.book_search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), models.Book.id)
+        )
+    if dialect == "sqlite":
+        fts = table("books_fts", column("rowid"))
+        matches = (
+            select(fts.c.rowid.label("book_id"), func.bm25(literal_column("books_fts")).label("rank"))
+            .where(literal_column("books_fts").op("MATCH")(_fts5_query(q)))
+            .subquery()
+        )
+        return (
+            query.join(matches, matches.c.book_id == models.Book.id)
+            .order_by(matches.c.rank, models.Book.id)
+        )
+    pattern = f"%{q}%"
+    return (
+        query.where(or_(models.Book.title.ilike(pattern), models.Book.description.ilike(pattern)))
+        .order_by(models.Book.id)
+    )
+
+# Columns for the lean list views, in response-schema field order
+BOOK_LIST_COLUMNS = {
+    "full": (
+        models.Book.title, models.Book.isbn, models.Book.published_date, models.Book.description,
+        models.Book.available, models.Book.author_id, models.Book.id,
+    ),
+    "summary": (
+        models.Book.title, models.Book.isbn, models.Book.published_date,
+        models.Book.available, models.Book.author_id, models.Book.id,
+    ),
+}
+
 async def get_books(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 10,
     title: Optional[str] = None,
     author_id: Optional[int] = None,
-    available: Optional[bool] = None
+    available: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None
 ) -> List[models.Book]:
-    query = select(models.Book)
+    params = _book_list_params(skip, limit, title, author_id, available, cursor, q)
+    query = _book_list_statement((models.Book,), db.get_bind().dialect.name, q, params)
+    result = await db.execute(query, params)
+    return result.scalars().all()
+
+async def get_book_rows(
+    db: AsyncSession,
+    columns,
+    skip: int = 0,
+    limit: int = 10,
+    title: Optional[str] = None,
+    author_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None
+) -> list:
+    """Like `get_books`, but returns plain row tuples of `columns` instead of entities."""
+    params = _book_list_params(skip, limit, title, author_id, available, cursor, q)
+    query = _book_list_statement(tuple(columns), db.get_bind().dialect.name, q, params)
+    result = await db.execute(query, params)
+    return result.all()
+
+async def count_books(
+    db: AsyncSession,
+    title: Optional[str] = None,
+    author_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    q: Optional[str] = None,
+    cap: Optional[int] = None
+) -> int:
+    """How many books `get_books` pages through with these filters; stops counting at `cap`."""
+    params = _book_list_params(0, cap, title, author_id, available, None, q)
+    matching = _filter_books(select(models.Book.id), db.get_bind().dialect.name, q, params).order_by(None)
+    return await db.scalar(select(func.count()).select_from(matching.subquery()), params)
+
+async def estimate_books(
+    db: AsyncSession,
+    title: Optional[str] = None,
+    author_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    q: Optional[str] = None
+) -> int:
+    """PostgreSQL planner's row estimate for the same filters; reads no rows."""
+    dialect = db.get_bind().dialect
+    params = _book_list_params(0, None, title, author_id, available, None, q)
+    matching = _filter_books(select(models.Book.id), dialect.name, q, params).order_by(None)
+    sql = matching.params(params).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    conn = await db.connection()
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def get_book_rows_by_ids(db: AsyncSession, columns, book_ids: List[int]) -> list:
+    """Rows of `columns` for the given books in `book_ids` order; unknown ids are left out."""
+    result = await db.execute(select(*columns).where(models.Book.id.in_(book_ids)))
+    by_id = {row.id: row for row in result.all()}
+    return [by_id[book_id] for book_id in book_ids if book_id in by_id]
+
+def _book_list_params(skip, limit, title, author_id, available, cursor, q) -> dict:
+    """Bind parameters for a book list; which keys are present decides the statement's shape."""
+    params = {}
     if title:
-        query = query.where(models.Book.title.ilike(f"%{title}%"))
+        params["title_pattern"] = f"%{title}%"
     if author_id:
-        query = query.where(models.Book.author_id == author_id)
+        params["author_id"] = author_id
     if available is not None:
-        query = query.where(models.Book.available == available)
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+        params["available"] = available
+    if cursor:
+        # Relevance order has no stable keyset, so search pages by offset only
+        if q and q.strip():
+            raise ValueError("cursor is not supported together with q; use skip/limit")
+        (params["last_id"],) = decode_cursor(cursor, int)
+    elif skip:
+        params["skip"] = skip
+    if limit is not None:
+        params["limit"] = limit
+    return params
+
+def _book_list_statement(columns: tuple, dialect: str, q: Optional[str], params: dict):
+    if q and q.strip():
+        # Search terms are part of the statement itself, so these are built per call
+        return _filter_books(select(*columns), dialect, q, params)
+    return _cached(
+        ("books", columns, frozenset(params)),
+        lambda: _filter_books(select(*columns), dialect, None, params),
+    )
+
+def _filter_books(query, dialect, q, params):
+    """Apply the filters named in `params` to `query`, as bind parameters of the same names."""
+    if q and q.strip():
+        query = _apply_book_search(query, dialect, q)
+    else:
+        query = query.order_by(models.Book.id)
+    if "title_pattern" in params:
+        query = query.where(models.Book.title.ilike(bindparam("title_pattern")))
+    if "author_id" in params:
+        query = query.where(models.Book.author_id == bindparam("author_id"))
+    if "available" in params:
+        query = query.where(models.Book.available == bindparam("available"))
+    if "last_id" in params:
+        query = query.where(models.Book.id > bindparam("last_id"))
+    if "skip" in params:
+        query = query.offset(bindparam("skip", type_=Integer))
+    if "limit" in params:
+        query = query.limit(bindparam("limit", type_=Integer))
+    return query
 
 async def update_book(db: AsyncSession, book_id: int, book_update: schemas.BookUpdate) -> Optional[models.Book]:
     db_book = await get_book(db, book_id)
     if not db_book:
         return None
+    old_author_id, was_available = db_book.author_id, db_book.available
     for key, value in book_update.model_dump(exclude_unset=True).items():
         if value is not None:
             setattr(db_book, key, value)
+    await stats.record_books(db, available=int(db_book.available) - int(was_available))
+    if db_book.author_id != old_author_id:
+        await stats.record_authors(db, {old_author_id: -1, db_book.author_id: 1})
     await db.commit()
+    http_cache.invalidate_book(book_id, old_author_id, db_book.author_id)
     await db.refresh(db_book)
     return db_book
 
@@ -95,62 +362,317 @@ async def delete_book(db: AsyncSession, book_id: int) -> bool:
     if not db_book:
         return False
     await db.delete(db_book)
+    await stats.record_books(db, books=-1, available=-int(db_book.available))
+    await stats.record_authors(db, {db_book.author_id: -1})
     await db.commit()
+    http_cache.invalidate_book(book_id, db_book.author_id)
     return True
 
 # ---- Borrowing ----
+# Claim a book with a conditional UPDATE so concurrent borrows can't both win
+_CLAIM_BOOK = (
+    update(models.Book)
+    .where(models.Book.id == bindparam("book_id"), models.Book.available.is_(True))
+    .values(available=False)
+    .returning(models.Book.author_id)
+    .execution_options(synchronize_session=False)
+)
+_BOOK_EXISTS = select(models.Book.id).where(models.Book.id == bindparam("book_id"))
+_INSERT_LOAN = insert(models.BorrowRecord).returning(models.BorrowRecord)
+_RELEASE_BOOK = (
+    update(models.Book)
+    .where(models.Book.id == bindparam("book_id"))
+    .values(available=True)
+    .returning(models.Book.author_id)
+    .execution_options(synchronize_session=False)
+)
+_LOAN_BY_ID = select(models.BorrowRecord).where(models.BorrowRecord.id == bindparam("record_id"))
+_ARCHIVED_LOAN_BY_ID = (
+    select(models.BorrowRecordArchive).where(models.BorrowRecordArchive.id == bindparam("record_id"))
+)
+
+def _return_statement(own_only: bool):
+    # Close an open loan, optionally only the given user's
+    def build():
+        conditions = [
+            models.BorrowRecord.id == bindparam("record_id"),
+            models.BorrowRecord.returned_at.is_(None),
+        ]
+        if own_only:
+            conditions.append(models.BorrowRecord.user_id == bindparam("owner_id"))
+        return (
+            update(models.BorrowRecord)
+            .where(*conditions)
+            .values(returned_at=bindparam("now"))
+            .returning(models.BorrowRecord)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+    return _cached(("return_loan", own_only), build)
+
 async def borrow_book(db: AsyncSession, borrow: schemas.BorrowCreate, user_id: int) -> Optional[models.BorrowRecord]:
-    # Check if book exists and is available
-    result = await db.execute(
-        select(models.Book).where(models.Book.id == borrow.book_id)
-    )
-    book = result.scalars().first()
-    if not book:
-        raise ValueError("Book not found")
-    if not book.available:
+    claimed = await db.execute(_CLAIM_BOOK, {"book_id": borrow.book_id})
+    author_id = claimed.scalar()
+    if author_id is None:
+        # Failure path only: release the claim attempt, then find out why it matched no row
+        await db.rollback()
+        exists = await db.scalar(_BOOK_EXISTS, {"book_id": borrow.book_id})
+        if exists is None:
+            raise ValueError("Book not found")
         raise ValueError("Book is not available")
 
     # Create borrow record
     due_date = datetime.utcnow() + timedelta(days=14)
-    record = models.BorrowRecord(
-        user_id=user_id,
-        book_id=borrow.book_id,
-        due_date=due_date
+    record = await db.scalar(
+        _INSERT_LOAN, {"user_id": user_id, "book_id": borrow.book_id, "due_date": due_date}
     )
-    db.add(record)
-    # Mark book as unavailable
-    book.available = False
+    await stats.record_books(db, available=-1, active_loans=1)
+    await stats.record_loans(db, loans=[record.borrowed_at.date()])
     await db.commit()
-    await db.refresh(record)
+    http_cache.invalidate_book(borrow.book_id, author_id)
     return record
 
-async def return_book(db: AsyncSession, record_id: int) -> Optional[models.BorrowRecord]:
-    result = await db.execute(
-        select(models.BorrowRecord).where(models.BorrowRecord.id == record_id)
-    )
-    record = result.scalars().first()
-    if not record:
-        return None
-    if record.returned_at:
+async def return_book(
+    db: AsyncSession,
+    record_id: int,
+    user_id: Optional[int] = None
+) -> Optional[models.BorrowRecord]:
+    """Close an open loan; with `user_id`, only that user's loan can be returned."""
+    params = {"record_id": record_id, "now": datetime.utcnow()}
+    if user_id is not None:
+        params["owner_id"] = user_id
+    record = await db.scalar(_return_statement(user_id is not None), params)
+    if record is None:
+        await db.rollback()
+        existing = await db.scalar(_LOAN_BY_ID, {"record_id": record_id})
+        if existing is None:
+            # Loans the archiver has moved were returned long ago
+            existing = await db.scalar(_ARCHIVED_LOAN_BY_ID, {"record_id": record_id})
+        if existing is None:
+            return None
+        if user_id is not None and existing.user_id != user_id:
+            raise PermissionError("Not your borrow record")
         raise ValueError("Book already returned")
 
-    record.returned_at = datetime.utcnow()
     # Mark book as available
-    book_result = await db.execute(
-        select(models.Book).where(models.Book.id == record.book_id)
-    )
-    book = book_result.scalars().first()
-    if book:
-        book.available = True
-
+    author_id = await db.scalar(_RELEASE_BOOK, {"book_id": record.book_id})
+    await stats.record_books(db, available=1, active_loans=-1)
+    await stats.record_loans(db, returns=[record.returned_at.date()])
     await db.commit()
-    await db.refresh(record)
+    http_cache.invalidate_book(record.book_id, author_id)
     return record
 
-async def get_borrow_history(db: AsyncSession, user_id: int) -> List[models.BorrowRecord]:
-    result = await db.execute(
+BatchOutcome = Tuple[int, Optional[models.BorrowRecord], Optional[str]]
+
+def _dedupe(ids: List[int]) -> Tuple[List[int], List[BatchOutcome]]:
+    seen, unique, duplicates = set(), [], []
+    for item_id in ids:
+        if item_id in seen:
+            duplicates.append((item_id, None, "Duplicate id in batch"))
+        else:
+            seen.add(item_id)
+            unique.append(item_id)
+    return unique, duplicates
+
+async def borrow_books(db: AsyncSession, book_ids: List[int], user_id: int) -> List[BatchOutcome]:
+    """Borrow several books in one transaction; returns (book_id, record, error) per id.
+
+    Same rules as `borrow_book`, applied with one set-based UPDATE and one
+    multi-row INSERT; books that can't be borrowed don't block the others.
+    """
+    unique, outcomes = _dedupe(book_ids)
+    claimed = dict((await db.execute(
+        update(models.Book)
+        .where(models.Book.id.in_(unique), models.Book.available.is_(True))
+        .values(available=False)
+        .returning(models.Book.id, models.Book.author_id)
+    )).all())
+
+    unclaimed = [book_id for book_id in unique if book_id not in claimed]
+    if unclaimed:
+        result = await db.execute(select(models.Book.id).where(models.Book.id.in_(unclaimed)))
+        existing = set(result.scalars().all())
+        outcomes += [
+            (book_id, None, "Book is not available" if book_id in existing else "Book not found")
+            for book_id in unclaimed
+        ]
+
+    to_insert = [book_id for book_id in unique if book_id in claimed]
+    if to_insert:
+        due_date = datetime.utcnow() + timedelta(days=14)
+        records = (await db.scalars(
+            insert(models.BorrowRecord).returning(models.BorrowRecord, sort_by_parameter_order=True),
+            [{"user_id": user_id, "book_id": book_id, "due_date": due_date} for book_id in to_insert],
+        )).all()
+        outcomes += [(record.book_id, record, None) for record in records]
+        await stats.record_books(db, available=-len(records), active_loans=len(records))
+        await stats.record_loans(db, loans=[record.borrowed_at.date() for record in records])
+    await db.commit()
+    for book_id, author_id in claimed.items():
+        http_cache.invalidate_book(book_id, author_id)
+
+    order = {book_id: i for i, book_id in enumerate(book_ids)}
+    return sorted(outcomes, key=lambda outcome: order[outcome[0]])
+
+async def return_books(db: AsyncSession, record_ids: List[int], user_id: int) -> List[BatchOutcome]:
+    """Return several of `user_id`'s loans in one transaction; (record_id, record, error) per id."""
+    unique, outcomes = _dedupe(record_ids)
+    records = (await db.scalars(
+        update(models.BorrowRecord)
+        .where(
+            models.BorrowRecord.id.in_(unique),
+            models.BorrowRecord.returned_at.is_(None),
+            models.BorrowRecord.user_id == user_id,
+        )
+        .values(returned_at=datetime.utcnow())
+        .returning(models.BorrowRecord)
+        .execution_options(populate_existing=True)
+    )).all()
+    outcomes += [(record.id, record, None) for record in records]
+
+    returned = {record.id for record in records}
+    failed = [record_id for record_id in unique if record_id not in returned]
+    if failed:
+        # Archived loans count too: they exist, they were just returned long ago
+        result = await db.execute(union_all(*(
+            select(model.id, model.user_id).where(model.id.in_(failed))
+            for model in (models.BorrowRecord, models.BorrowRecordArchive)
+        )))
+        owners = dict(result.all())
+        for record_id in failed:
+            if record_id not in owners:
+                error = "Borrow record not found"
+            elif owners[record_id] != user_id:
+                error = "Not your borrow record"
+            else:
+                error = "Book already returned"
+            outcomes.append((record_id, None, error))
+
+    freed = []
+    if records:
+        freed = (await db.execute(
+            update(models.Book)
+            .where(models.Book.id.in_({record.book_id for record in records}))
+            .values(available=True)
+            .returning(models.Book.id, models.Book.author_id)
+        )).all()
+        await stats.record_books(db, available=len(freed), active_loans=-len(records))
+        await stats.record_loans(db, returns=[record.returned_at.date() for record in records])
+    await db.commit()
+    for book_id, author_id in freed:
+        http_cache.invalidate_book(book_id, author_id)
+
+    order = {record_id: i for i, record_id in enumerate(record_ids)}
+    return sorted(outcomes, key=lambda outcome: order[outcome[0]])
+
+def _history_part(model, user_id: int, after: Optional[tuple], fetch: Optional[int]):
+    query = (
+        select(*(getattr(model, name) for name in models.BORROW_RECORD_COLUMNS))
+        .where(model.user_id == user_id)
+        .order_by(model.borrowed_at.desc(), model.id.desc())
+    )
+    if after:
+        query = query.where(tuple_(model.borrowed_at, model.id) < tuple_(*after))
+    if fetch is not None:
+        query = query.limit(fetch)
+    return select(query.subquery())
+
+async def _merged_history(
+    db: AsyncSession,
+    user_id: int,
+    skip: int,
+    limit: Optional[int],
+    cursor: Optional[str]
+) -> list:
+    """Hot and archived loans of one user as rows, in one (borrowed_at, id) order.
+
+    Each side is cut to the page before the UNION ALL, so a page reads at most
+    skip + limit rows from either table.
+    """
+    after = tuple(decode_cursor(cursor, datetime, int)) if cursor else None
+    offset = 0 if cursor else skip
+    fetch = offset + limit if limit is not None else None
+    merged = union_all(
+        _history_part(models.BorrowRecord, user_id, after, fetch),
+        _history_part(models.BorrowRecordArchive, user_id, after, fetch),
+    ).subquery()
+    query = select(merged).order_by(merged.c.borrowed_at.desc(), merged.c.id.desc())
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return result.all()
+
+async def get_borrow_history(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_archived: bool = False
+) -> list:
+    """A user's loans, newest first; `include_archived` adds loans the archiver has moved.
+
+    Hot-only history returns entities; with the archive it returns rows
+    with the same attributes.
+    """
+    if include_archived:
+        return await _merged_history(db, user_id, skip, limit, cursor)
+    params = {"user_id": user_id}
+    if cursor:
+        params["last_borrowed_at"], params["last_id"] = decode_cursor(cursor, datetime, int)
+    elif skip:
+        params["skip"] = skip
+    if limit is not None:
+        params["limit"] = limit
+    query = _cached(("history", frozenset(params)), lambda: _history_statement(params))
+    result = await db.execute(query, params)
+    return result.scalars().all()
+
+def _history_statement(params: dict):
+    query = (
+        select(models.BorrowRecord)
+        .where(models.BorrowRecord.user_id == bindparam("user_id"))
+        .order_by(models.BorrowRecord.borrowed_at.desc(), models.BorrowRecord.id.desc())
+    )
+    if "last_id" in params:
+        # (borrowed_at, id) is unique, so rows sharing a timestamp are not skipped
+        query = query.where(
+            tuple_(models.BorrowRecord.borrowed_at, models.BorrowRecord.id)
+            < tuple_(bindparam("last_borrowed_at", type_=DateTime), bindparam("last_id", type_=Integer))
+        )
+    if "skip" in params:
+        query = query.offset(bindparam("skip", type_=Integer))
+    if "limit" in params:
+        query = query.limit(bindparam("limit", type_=Integer))
+    return query
+
+def overdue_clause(now: datetime):
+    # Matches the ix_borrow_records_open_due partial index predicate
+    return and_(models.BorrowRecord.returned_at.is_(None), models.BorrowRecord.due_date < now)
+
+async def get_overdue_loans(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    user_id: Optional[int] = None
+) -> List[models.BorrowRecord]:
+    """Open loans past their due date, most overdue first."""
+    query = (
         select(models.BorrowRecord)
-        .where(models.BorrowRecord.user_id == user_id)
-        .order_by(models.BorrowRecord.borrowed_at.desc())
+        .where(overdue_clause(datetime.utcnow()))
+        .order_by(models.BorrowRecord.due_date, models.BorrowRecord.id)
     )
+    if user_id is not None:
+        query = query.where(models.BorrowRecord.user_id == user_id)
+    if cursor:
+        last_due_date, last_id = decode_cursor(cursor, datetime, int)
+        query = query.where(
+            tuple_(models.BorrowRecord.due_date, models.BorrowRecord.id)
+            > tuple_(last_due_date, last_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
     return result.scalars().all()
\ No newline at end of file
@@ -1,15 +1,63 @@
 # app/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import asyncio
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, raiseload, sessionmaker
 import os
-from dotenv import load_dotenv
+from typing import Optional
+from app import APP_ENV
 from app.models import Base 
 
-load_dotenv()
+# APP_ENV (read, along with .env, in app/__init__.py): "production" also skips
+# create_all at boot and warms pools
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional replica for pure-read endpoints; writes always go to DATABASE_URL
+DATABASE_READ_REPLICA_URL = os.getenv("DATABASE_READ_REPLICA_URL")
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+# Engine tuning (see .env.example)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500"))
+# "false" (default), "true" to log every statement, "debug" to also log result rows
+DB_ECHO = os.getenv("DB_ECHO", "false").lower()
+# Raise instead of silently emitting SQL when an unloaded relationship is touched
+STRICT_LAZY_LOADS = os.getenv("STRICT_LAZY_LOADS", "false").lower() == "true"
+# Connections each engine opens at startup; defaults to the pool size in production
+DB_WARM_CONNECTIONS = int(os.getenv(
+    "DB_WARM_CONNECTIONS", str(DB_POOL_SIZE) if APP_ENV == "production" else "0"
+))
+
+
+def create_engine(url: Optional[str]) -> AsyncEngine:
+    """Build an async engine for `url` using the DB_* settings above."""
+    options = {
+        "future": True,
+        "echo": {"true": True, "debug": "debug"}.get(DB_ECHO, False),
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+    }
+    parsed = make_url(url) if url else None
+    if parsed is None or parsed.get_backend_name() != "sqlite":
+        # SQLite gets a NullPool/StaticPool, which take no sizing arguments
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    if parsed is not None and parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE}
+    return create_async_engine(url, **options)
+
+
+engine = create_engine(DATABASE_URL)
+read_engine = create_engine(DATABASE_READ_REPLICA_URL) if DATABASE_READ_REPLICA_URL else engine
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -19,6 +67,48 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+def _raise_on_lazy_load(orm_execute_state):
+    # Explicit selectinload/joinedload options still win over the wildcard
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            raiseload("*", sql_only=True)
+        )
+
+def enable_strict_loading():
+    """Make every ORM query mark relationships it did not load as raise-on-access."""
+    if not event.contains(Session, "do_orm_execute", _raise_on_lazy_load):
+        event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+
+if STRICT_LAZY_LOADS:
+    enable_strict_loading()
+
+async def warm_pool(engine: AsyncEngine, connections: int = DB_WARM_CONNECTIONS) -> None:
+    """Open `connections` connections at once, check each with a round trip, and pool them."""
+    if connections <= 0:
+        return
+    conns = await asyncio.gather(*(engine.connect() for _ in range(connections)))
+    try:
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in conns))
+
 async def get_db():
     async with AsyncSessionLocal() as session:
+        yield session
+
+async def get_read_db():
+    """Session for read-only endpoints; uses the replica when one is configured."""
+    async with ReadSessionLocal() as session:
         yield session
\ No newline at end of file
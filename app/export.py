@@ -0,0 +1,77 @@
+# app/export.py
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, List
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, union_all
+
+from . import database
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def stream_table(model, fmt: str, archive=None, **filters) -> AsyncIterator[bytes]:
+    """Yield every row of `model`'s table as NDJSON or CSV, one chunk per fetched batch.
+
+    `filters` are column == value conditions. With `archive`, that table's rows
+    (same columns, same filters) are merged in by id through UNION ALL: one
+    statement, so a row moved to the archive meanwhile is neither lost nor
+    doubled. Selects bare columns rather than ORM entities so nothing
+    accumulates in an identity map, and opens its own session because it
+    outlives the request handler.
+    """
+    columns = list(model.__table__.columns)
+    names: List[str] = [c.key for c in columns]
+
+    def rows_of(table):
+        return select(*(table.c[name] for name in names)).where(
+            *(table.c[name] == value for name, value in filters.items())
+        )
+
+    if archive is None:
+        query = rows_of(model.__table__).order_by(model.__table__.c.id)
+    else:
+        query = union_all(rows_of(model.__table__), rows_of(archive.__table__))
+        query = query.order_by(query.selected_columns.id)
+    query = query.execution_options(yield_per=EXPORT_YIELD_PER)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield buffer.getvalue().encode("utf-8")
+
+    async with database.ReadSessionLocal() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([_plain(v) for v in row] for row in partition)
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps(dict(zip(names, map(_plain, row))), separators=(",", ":")) + "\n"
+                    for row in partition
+                )
+            yield chunk.encode("utf-8")
+
+
+def export_response(model, fmt: str, filename: str, archive=None, **filters) -> StreamingResponse:
+    return StreamingResponse(
+        stream_table(model, fmt, archive, **filters),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
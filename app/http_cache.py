@@ -0,0 +1,81 @@
+# app/http_cache.py
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+
+from .cache import TTLCache
+
+# Rendered detail responses (book / author), per worker process. Writes only
+# invalidate the worker that handled them, so with several workers (uvicorn and
+# gunicorn both read WEB_CONCURRENCY) the others may serve, and answer 304 for,
+# the old representation until it expires; the default TTL is short there.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+DETAIL_CACHE_SIZE = int(os.getenv("DETAIL_CACHE_SIZE", "5000"))
+DETAIL_CACHE_TTL_SECONDS = float(
+    os.getenv("DETAIL_CACHE_TTL_SECONDS", "300" if WEB_CONCURRENCY <= 1 else "5")
+)
+
+_cache = TTLCache(maxsize=DETAIL_CACHE_SIZE, ttl=DETAIL_CACHE_TTL_SECONDS)
+# Bumped on every invalidation; a fill that started before a write is not stored
+_generation = 0
+
+
+# No Last-Modified: rows carry no update time, and the time of the cache fill
+# would move forward on every refill and mislead If-Modified-Since checks
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+def generation() -> int:
+    return _generation
+
+
+def get(kind: str, entity_id: int) -> Optional[CachedResponse]:
+    return _cache.get((kind, entity_id))
+
+
+def store(kind: str, entity_id: int, body: bytes, started_at: int) -> CachedResponse:
+    """Wrap `body` with an ETag and cache it unless a write happened since `started_at`."""
+    entry = CachedResponse(body=body, etag='"%s"' % hashlib.sha1(body).hexdigest())
+    if started_at == _generation:
+        _cache.set((kind, entity_id), entry)
+    return entry
+
+
+def invalidate(kind: str, entity_ids: Iterable[Optional[int]]) -> None:
+    global _generation
+    _generation += 1
+    for entity_id in entity_ids:
+        if entity_id is not None:
+            _cache.delete((kind, entity_id))
+
+
+def invalidate_book(book_id: Optional[int], *author_ids: Optional[int]) -> None:
+    """A book change also stales its author's detail, which embeds the book list."""
+    invalidate("book", [book_id])
+    invalidate("author", author_ids)
+
+
+def clear() -> None:
+    global _generation
+    _generation += 1
+    _cache.clear()
+
+
+def respond(request: Request, entry: CachedResponse) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        # Clients may keep the copy but must revalidate it with If-None-Match
+        "Cache-Control": "private, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or entry.etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
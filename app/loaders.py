@@ -0,0 +1,86 @@
+# app/loaders.py
+"""Per-request batching loaders: many `load(id)` calls, one `IN` query.
+
+Every `load(key)` made in the same event-loop turn is collected and resolved
+by a single `fetch(keys)` call; results are memoized for the loader's
+lifetime. Loaders hold a session and a memo, so they live for one request
+only; routes get them through the `get_loaders` dependency.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, database
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    def __init__(self, fetch: Callable[[List[K]], Awaitable[Dict[K, V]]]):
+        self._fetch = fetch
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._pending: List[K] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        """Future for `key`'s value (None if it doesn't exist); fetched with the rest of this turn's keys."""
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                # Dispatch once the current turn is over, so later loads join this batch
+                loop.call_soon(self._start_dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _start_dispatch(self) -> None:
+        # The loop only keeps weak references to tasks; hold on until it finishes
+        task = asyncio.get_running_loop().create_task(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        try:
+            found = await self._fetch(keys)
+        except Exception as e:
+            for key in keys:
+                # Don't memoize failures; a later load may retry
+                self._futures.pop(key).set_exception(e)
+            return
+        for key in keys:
+            self._futures[key].set_result(found.get(key))
+
+
+class Loaders:
+    """The loaders available to one request, created on first use."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._authors: Dict[str, BatchLoader[int, dict]] = {}
+
+    def authors(self, view: str = "full") -> BatchLoader[int, dict]:
+        """Authors as plain dicts in `schemas.Author` shape (`view=summary` leaves out `bio`)."""
+        loader = self._authors.get(view)
+        if loader is None:
+            columns = crud.AUTHOR_LIST_COLUMNS[view]
+            keys = [c.key for c in columns]
+
+            async def fetch(author_ids: List[int]) -> Dict[int, dict]:
+                rows = await crud.get_author_rows_by_ids(self.db, columns, author_ids)
+                return {row.id: dict(zip(keys, row)) for row in rows}
+
+            loader = self._authors[view] = BatchLoader(fetch)
+        return loader
+
+
+async def get_loaders(db: AsyncSession = Depends(database.get_read_db)) -> Loaders:
+    # FastAPI caches get_read_db per request, so loaders share the route's session
+    return Loaders(db)
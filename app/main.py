@@ -1,19 +1,32 @@
 # app/main.py
-from fastapi import FastAPI
+import asyncio
+import json
+import logging
+import os
+import time
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import auth, authors, books, borrow
+from fastapi.responses import PlainTextResponse
+from . import admission, archive, counts, metrics, overdue, profiling, revocation
+from .database import APP_ENV, engine, read_engine, warm_pool, Base
+from .pagination import NEXT_CURSOR_HEADER
+from .routers import auth, authors, books, borrow, stats
 from fastapi.openapi.utils import get_openapi
 
+# OpenAPI document generated at build time (`python -m app.openapi openapi.json`);
+# loaded instead of walking every route when set
+OPENAPI_SCHEMA_PATH = os.getenv("OPENAPI_SCHEMA_PATH")
+
+logger = logging.getLogger("app.startup")
+
 app = FastAPI(
     title="📚 Library Management API",
     description="A FastAPI-based library system with JWT auth",
     version="1.0.0",
 )
 
-def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
+def build_openapi() -> dict:
+    """Generate the OpenAPI document from the routes."""
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -33,31 +46,79 @@ def custom_openapi():
         for operation in path.values():
             if "tags" in operation and "Auth" not in operation["tags"]:
                 operation["security"] = [{"Bearer": []}]
-    app.openapi_schema = openapi_schema
     return openapi_schema
 
+def custom_openapi():
+    if app.openapi_schema:
+        return app.openapi_schema
+    if OPENAPI_SCHEMA_PATH:
+        with open(OPENAPI_SCHEMA_PATH) as f:
+            app.openapi_schema = json.load(f)
+    else:
+        app.openapi_schema = build_openapi()
+    return app.openapi_schema
+
 app.openapi = custom_openapi
-# CORS (for frontend/postman)
+# Opt-in cProfile traces (X-Profile header or PROFILE_SAMPLE_RATE); innermost, so a
+# trace covers the request itself and not its wait for an admission slot
+app.add_middleware(profiling.ProfilingMiddleware)
+# Per-route-group concurrency limits; inside CORS, so shed responses still get CORS
+# headers and are counted in /metrics
+app.add_middleware(admission.AdmissionMiddleware)
+# CORS (for frontend/postman); browsers only let cross-origin scripts read the
+# response headers listed in expose_headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, counts.TOTAL_COUNT_HEADER, counts.TOTAL_COUNT_EXACT_HEADER],
 )
 
-# Include routers
+# Per-route latency / size / SQL metrics, exposed on /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine, "primary")
+if read_engine is not engine:
+    metrics.instrument_engine(read_engine, "replica")
+
+# Include routers; everything but auth is subject to the per-user rate limit
+rate_limited = [Depends(admission.rate_limit)]
 app.include_router(auth.router)
-app.include_router(authors.router)
-app.include_router(books.router)
-app.include_router(borrow.router)
+app.include_router(authors.router, dependencies=rate_limited)
+app.include_router(books.router, dependencies=rate_limited)
+app.include_router(borrow.router, dependencies=rate_limited)
+app.include_router(stats.router, dependencies=rate_limited)
 
 @app.on_event("startup")
 async def startup():
-    # Create tables (⚠️ only for dev!)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    started = time.perf_counter()
+    if APP_ENV != "production":
+        # Create tables (⚠️ only for dev!); in production the schema is managed by migrations
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await asyncio.gather(*(warm_pool(e) for e in {engine, read_engine}))
+    if APP_ENV == "production":
+        # Build (or load) the OpenAPI document now instead of on the first /docs hit
+        app.openapi()
+    # Periodic overdue sweep (OVERDUE_SWEEP_INTERVAL_SECONDS=0 disables it)
+    overdue.start()
+    # Periodic archiving of old returned loans (ARCHIVE_INTERVAL_SECONDS=0 disables it)
+    archive.start()
+    # Periodic purge of expired revoked refresh tokens (REVOKED_TOKEN_PURGE_INTERVAL_SECONDS=0 disables it)
+    revocation.start()
+    logger.info("%s startup finished in %.1f ms", APP_ENV, (time.perf_counter() - started) * 1000)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await overdue.stop()
+    await archive.stop()
+    await revocation.stop()
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the Library API! 📖", "docs": "/docs"}
\ No newline at end of file
+    return {"message": "Welcome to the Library API! 📖", "docs": "/docs"}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
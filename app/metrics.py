@@ -0,0 +1,219 @@
+# app/metrics.py
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Statements slower than this are logged to "app.sql.slow"; unset disables the log
+SLOW_QUERY_MS = os.getenv("SLOW_QUERY_MS")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = ['%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{%s}" % ",".join(parts) if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        super().__init__(name, documentation)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(k)} {v}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+        # labels -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[Labels, List] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        lines = self.header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route, method and status.")
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "HTTP response body size by route.", SIZE_BUCKETS)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+REQUEST_DB_STATEMENTS = Histogram("http_request_db_statements", "SQL statements issued per request by route.", COUNT_BUCKETS)
+REQUEST_DB_TIME = Histogram("http_request_db_seconds", "Time spent in SQL per request by route.", LATENCY_BUCKETS)
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed, by engine.")
+DB_STATEMENT_LATENCY = Histogram("db_statement_duration_seconds", "SQL statement latency, by engine.", LATENCY_BUCKETS)
+OVERDUE_FLAGGED = Counter("overdue_loans_flagged_total", "Loans flagged overdue by the background sweep.")
+LOANS_ARCHIVED = Counter("loans_archived_total", "Returned loans moved to the archive table.")
+ADMISSION_ACTIVE = Gauge("admission_active_requests", "Requests holding an admission slot, by route group.")
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests shed with 503 by admission control, by route group.")
+RATE_LIMITED = Counter("rate_limited_total", "Requests rejected with 429 by the per-user rate limit.")
+PROFILED_REQUESTS = Counter("profiled_requests_total", "Requests traced by the profiling middleware.")
+
+REGISTRY = [
+    REQUESTS, REQUEST_LATENCY, RESPONSE_SIZE, IN_FLIGHT,
+    REQUEST_DB_STATEMENTS, REQUEST_DB_TIME, DB_STATEMENTS, DB_STATEMENT_LATENCY,
+    OVERDUE_FLAGGED, LOANS_ARCHIVED, ADMISSION_ACTIVE, ADMISSION_REJECTED, RATE_LIMITED,
+    PROFILED_REQUESTS,
+]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- Per-request SQL accounting ----
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Count and time every statement on `engine`, globally and for the current request."""
+    sync_engine = engine.sync_engine
+    threshold = float(SLOW_QUERY_MS) / 1000 if SLOW_QUERY_MS else None
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_STATEMENTS.inc(engine=name)
+        DB_STATEMENT_LATENCY.observe(elapsed, engine=name)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+        if threshold is not None and elapsed >= threshold:
+            slow_query_logger.warning("slow query (%.1f ms) on %s: %s", elapsed * 1000, name, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        # after_cursor_execute does not fire for failed statements
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, size, in-flight and SQL use per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            _request_stats.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUESTS.inc(route=path, method=method, status=str(status_code))
+            REQUEST_LATENCY.observe(elapsed, route=path, method=method)
+            RESPONSE_SIZE.observe(size, route=path, method=method)
+            REQUEST_DB_STATEMENTS.observe(stats.statements, route=path, method=method)
+            REQUEST_DB_TIME.observe(stats.db_seconds, route=path, method=method)
@@ -1,11 +1,22 @@
 # app/models.py
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Date, Text
+from sqlalchemy import DDL, Index, event, func, literal_column
+from sqlalchemy.dialects import postgresql  # noqa: F401  registers to_tsvector & co.
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+def _search_vector(title, description):
+    # Constants are inlined so queries match the index expression exactly
+    return func.to_tsvector(
+        literal_column("'english'"),
+        func.coalesce(title, literal_column("''"))
+        + literal_column("' '")
+        + func.coalesce(description, literal_column("''")),
+    )
+
 class User(Base):
     __tablename__ = "users"
 
@@ -42,6 +53,58 @@ class Book(Base):
     author = relationship("Author", back_populates="books")
     borrow_records = relationship("BorrowRecord", back_populates="book")
 
+    # Postgres: GIN index over title + description for ranked search, plus a
+    # trigram index so `title ILIKE '%...%'` no longer scans the table
+    __table_args__ = (
+        Index(
+            "ix_books_search_vector",
+            _search_vector(title, description),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_books_title_trgm",
+            title,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # get_books(author_id=..., available=...) ordered by id
+        Index("ix_books_author_available", author_id, available, id),
+    )
+
+# ---- Book search ----
+book_search_vector = _search_vector(Book.title, Book.description)
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# SQLite: external-content FTS5 table kept in sync with `books` by triggers
+_sqlite_fts_ddl = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, description, content='books', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, description ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+for _statement in _sqlite_fts_ddl:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Book.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS books_fts").execute_if(dialect="sqlite"),
+)
+
 class BorrowRecord(Base):
     __tablename__ = "borrow_records"
 
@@ -51,6 +114,110 @@ class BorrowRecord(Base):
     borrowed_at = Column(DateTime, default=datetime.utcnow)
     due_date = Column(DateTime, nullable=False)  # e.g. 14 days from borrow
     returned_at = Column(DateTime, nullable=True)  # null if not returned
+    overdue_flagged_at = Column(DateTime, nullable=True)  # set by the overdue sweep
 
     user = relationship("User", back_populates="borrow_records")
-    book = relationship("Book", back_populates="borrow_records")
\ No newline at end of file
+    book = relationship("Book", back_populates="borrow_records")
+
+    __table_args__ = (
+        # get_borrow_history: one user's loans, newest first, keyset on (borrowed_at, id)
+        Index("ix_borrow_records_user_borrowed", user_id, borrowed_at.desc(), id.desc()),
+        # Loans of a book; also what the books -> borrow_records foreign key checks use
+        Index("ix_borrow_records_book_id", book_id),
+        # Partial indexes cover open loans only, so they stay small as history grows:
+        # one for the overdue listing, one for the sweep's not-yet-flagged backlog
+        Index(
+            "ix_borrow_records_open_due",
+            due_date,
+            postgresql_where=returned_at.is_(None),
+            sqlite_where=returned_at.is_(None),
+        ),
+        Index(
+            "ix_borrow_records_unflagged_due",
+            due_date,
+            postgresql_where=returned_at.is_(None) & overdue_flagged_at.is_(None),
+            sqlite_where=returned_at.is_(None) & overdue_flagged_at.is_(None),
+        ),
+        # Returned loans by age, for the archiver (app/archive.py)
+        Index(
+            "ix_borrow_records_returned_at",
+            returned_at,
+            postgresql_where=returned_at.is_not(None),
+            sqlite_where=returned_at.is_not(None),
+        ),
+    )
+
+class BorrowRecordArchive(Base):
+    """Returned loans moved out of borrow_records by the archiver, keeping their ids.
+
+    On PostgreSQL the table is range-partitioned by `borrowed_at`, one
+    partition per year, created by the archiver as needed. There are no
+    foreign keys: rows are history only, and inserts stay cheap.
+    """
+    __tablename__ = "borrow_records_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    # Partition key, so PostgreSQL needs it in the primary key
+    borrowed_at = Column(DateTime, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    book_id = Column(Integer, nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    returned_at = Column(DateTime, nullable=False)
+    overdue_flagged_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_borrow_records_archive_user_borrowed", user_id, borrowed_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (borrowed_at)"},
+    )
+
+# Every borrow_records column, which the archive repeats (it adds archived_at): what
+# the archiver copies, and what history and the borrow export read from both tables
+BORROW_RECORD_COLUMNS = tuple(column.key for column in BorrowRecord.__table__.columns)
+
+class RevokedToken(Base):
+    """Refresh tokens already used (rotated away) or revoked, by `jti`, until they expire.
+
+    The primary key makes each token usable once; app/revocation.py purges
+    rows past `expires_at`, when the token would be rejected anyway.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class RevokedTokenFamily(Base):
+    """Revoked refresh token families: every token descended from one login.
+
+    Written on logout and when a used token is presented again, which means a
+    copy of it is in someone else's hands. `expires_at` is past the expiry of
+    any token the family can hold.
+    """
+    __tablename__ = "revoked_token_families"
+
+    family = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# ---- Catalog statistics (maintained by crud, see app/stats.py) ----
+class CatalogCounter(Base):
+    """Catalog-wide totals, split over a few slots so concurrent writers rarely share a row."""
+    __tablename__ = "catalog_counters"
+
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    books = Column(Integer, nullable=False, default=0)
+    available_books = Column(Integer, nullable=False, default=0)
+    active_loans = Column(Integer, nullable=False, default=0)
+
+class AuthorBookCount(Base):
+    __tablename__ = "author_book_counts"
+
+    author_id = Column(Integer, ForeignKey("authors.id"), primary_key=True, autoincrement=False)
+    books = Column(Integer, nullable=False, default=0)
+
+class DailyLoanCount(Base):
+    __tablename__ = "daily_loan_counts"
+
+    day = Column(Date, primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    loans = Column(Integer, nullable=False, default=0)
+    returns = Column(Integer, nullable=False, default=0)
\ No newline at end of file
@@ -0,0 +1,19 @@
+# app/openapi.py
+"""Write the OpenAPI document to a file at build time.
+
+    python -m app.openapi openapi.json
+
+Point OPENAPI_SCHEMA_PATH at the file and the app serves it as-is instead of
+generating it from the routes.
+"""
+import argparse
+import json
+
+from .main import build_openapi
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output")
+    args = parser.parse_args()
+    with open(args.output, "w") as f:
+        json.dump(build_openapi(), f)
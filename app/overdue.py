@@ -0,0 +1,90 @@
+# app/overdue.py
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from . import crud, metrics, models
+from .database import AsyncSessionLocal
+
+# Seconds between overdue sweeps; 0 disables the background task
+OVERDUE_SWEEP_INTERVAL_SECONDS = float(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", "300"))
+# Loans flagged per transaction, so no sweep holds locks for long
+OVERDUE_SWEEP_CHUNK_SIZE = int(os.getenv("OVERDUE_SWEEP_CHUNK_SIZE", "500"))
+
+logger = logging.getLogger("app.overdue")
+
+_task: Optional[asyncio.Task] = None
+
+
+async def sweep_once(chunk_size: int = OVERDUE_SWEEP_CHUNK_SIZE) -> int:
+    """Flag every open loan that has passed its due date; returns how many were flagged.
+
+    Works in chunks of `chunk_size`, each in its own short transaction. Loans
+    already flagged are skipped, so several workers can sweep at once.
+    """
+    now = datetime.utcnow()
+    unflagged = (
+        crud.overdue_clause(now),
+        models.BorrowRecord.overdue_flagged_at.is_(None),
+    )
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            chunk = (
+                select(models.BorrowRecord.id)
+                .where(*unflagged)
+                .order_by(models.BorrowRecord.due_date)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                update(models.BorrowRecord)
+                .where(models.BorrowRecord.id.in_(chunk), *unflagged)
+                .values(overdue_flagged_at=now)
+                .returning(models.BorrowRecord.id, models.BorrowRecord.user_id, models.BorrowRecord.book_id)
+                .execution_options(synchronize_session=False)
+            )
+            flagged = result.all()
+            await db.commit()
+        for record_id, user_id, book_id in flagged:
+            logger.info("loan %s overdue: user %s, book %s", record_id, user_id, book_id)
+        metrics.OVERDUE_FLAGGED.inc(len(flagged))
+        total += len(flagged)
+        if len(flagged) < chunk_size:
+            return total
+        await asyncio.sleep(0)  # let requests run between chunks
+
+
+async def _run(interval: float) -> None:
+    while True:
+        try:
+            flagged = await sweep_once()
+            if flagged:
+                logger.info("overdue sweep flagged %d loans", flagged)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("overdue sweep failed")
+        await asyncio.sleep(interval)
+
+
+def start(interval: float = OVERDUE_SWEEP_INTERVAL_SECONDS) -> None:
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.create_task(_run(interval))
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
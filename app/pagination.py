@@ -0,0 +1,40 @@
+# app/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+# Returned on list endpoints when another page is available
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row into an opaque, URL-safe cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """Unpack a cursor made by `encode_cursor`, checking each value against `types`.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for value, type_ in zip(values, types):
+        if type_ is datetime and isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+        if not isinstance(value, type_) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
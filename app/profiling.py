@@ -0,0 +1,221 @@
+# app/profiling.py
+"""Opt-in cProfile traces of single requests, broken down by phase.
+
+A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>`, or is
+picked by PROFILE_SAMPLE_RATE. Its trace goes to PROFILE_DIR as a pstats file
+(`python -m pstats <file>`, snakeviz, ...) next to a JSON summary. Only the
+newest PROFILE_MAX_TRACES are kept. The response gets `X-Profile-Id` and a
+`Server-Timing` header with the phases.
+
+cProfile sees the whole event-loop thread, so other requests running at the
+same moment show up in the trace too; one request is profiled at a time.
+"""
+import asyncio
+import contextvars
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from . import metrics
+
+# Shared secret for the X-Profile header; unset disables header-triggered profiling
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+# Fraction of /api/v1 requests profiled without the header (0 = none)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "library_profiles"))
+# Traces kept on disk; older ones are deleted as new ones are written
+PROFILE_MAX_TRACES = int(os.getenv("PROFILE_MAX_TRACES", "100"))
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+SERIALIZE_RESPONSE = ("fastapi/routing.py", "serialize_response")
+
+# Phase -> (path fragment, function, caller) entry points whose cumulative CPU
+# time counts towards it; with a caller, only calls made directly from it count.
+# None of them run inside another, so the phases don't overlap. "db" is not
+# here: it is wall time, measured per statement by app/metrics.py, and the
+# statement time inside an entry point (see `phase_db`) is taken out of its phase.
+PHASES: Dict[str, tuple] = {
+    "auth": (("app/auth.py", "get_current_user", None),),
+    "validation": (
+        ("fastapi/dependencies/utils.py", "request_params_to_args", None),
+        ("fastapi/dependencies/utils.py", "request_body_to_args", None),
+        ("pydantic/main.py", "model_validate", None),
+        # response_model validation; the rest of serialize_response is dumping
+        ("fastapi/_compat", "validate", SERIALIZE_RESPONSE),
+    ),
+    "serialization": (
+        ("fastapi/_compat", "serialize", SERIALIZE_RESPONSE),
+        ("fastapi/_compat", "serialize_json", SERIALIZE_RESPONSE),
+        ("fastapi/encoders.py", "jsonable_encoder", SERIALIZE_RESPONSE),
+        ("starlette/responses.py", "render", None),
+        ("app/responses.py", "render", None),
+        ("pydantic/main.py", "model_dump_json", None),
+    ),
+}
+
+_active = False
+# Statement seconds spent inside each phase, for the request being profiled
+_phase_db: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "profiling_phase_db", default=None
+)
+
+
+@contextmanager
+def phase_db(phase: str):
+    """Record the SQL time inside this block as `phase`'s, when the request is profiled.
+
+    That time is already counted under "db", so `phase_breakdown` subtracts it
+    from the phase's CPU time.
+    """
+    totals = _phase_db.get()
+    request_stats = metrics.current_request_stats()
+    if totals is None or request_stats is None:
+        yield
+        return
+    before = request_stats.db_seconds
+    try:
+        yield
+    finally:
+        totals[phase] = totals.get(phase, 0.0) + request_stats.db_seconds - before
+
+
+def _wanted(scope) -> bool:
+    if scope["type"] != "http" or not scope["path"].startswith("/api/v1/"):
+        return False
+    if PROFILE_TOKEN:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, PROFILE_TOKEN.encode())
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _is(func: tuple, fragment: str, name: str) -> bool:
+    filename, _, function = func
+    return function == name and fragment in filename.replace(os.sep, "/")
+
+
+def phase_breakdown(
+    stats: pstats.Stats, wall: float, db: float, db_by_phase: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """Seconds per phase; "other" is routing, handler code and time spent waiting."""
+    phases = dict.fromkeys(PHASES, 0.0)
+    for func, (_, _, _, cumulative, callers) in stats.stats.items():
+        for phase, entry_points in PHASES.items():
+            for fragment, name, caller in entry_points:
+                if not _is(func, fragment, name):
+                    continue
+                if caller is None:
+                    phases[phase] += cumulative
+                else:
+                    phases[phase] += sum(
+                        timings[3] for calling, timings in callers.items() if _is(calling, *caller)
+                    )
+    for phase, seconds in (db_by_phase or {}).items():
+        phases[phase] = max(0.0, phases[phase] - seconds)
+    phases["db"] = db
+    phases["other"] = max(0.0, wall - sum(phases.values()))
+    return phases
+
+
+def _top_functions(stats: pstats.Stats, limit: int = 15) -> List[dict]:
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {"function": f"{filename}:{line}({function})", "calls": calls, "cumulative_ms": round(cumulative * 1000, 3)}
+        for (filename, line, function), (_, calls, _, cumulative, _) in rows
+    ]
+
+
+def _write(trace_id: str, profile: cProfile.Profile, summary: dict) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, trace_id)
+    profile.dump_stats(base + ".prof")
+    with open(base + ".json", "w") as f:
+        json.dump(summary, f, indent=2)
+    # Retention: trace ids sort by time, so drop the oldest beyond the limit
+    traces = sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".prof"))
+    for stale in traces[:max(0, len(traces) - PROFILE_MAX_TRACES)]:
+        for ext in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stale + ext))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles the requests `_wanted` picks, one at a time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if _active or not _wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        _active = True
+        trace_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f") + "-" + uuid.uuid4().hex[:6]
+        request_stats = metrics.current_request_stats() or metrics.RequestStats()
+        db_before = request_stats.db_seconds
+        profile = cProfile.Profile()
+        db_by_phase: Dict[str, float] = {}
+        phase_db_token = _phase_db.set(db_by_phase)
+        summary = {}
+        stopped = False
+
+        def stop(status_code: int) -> Dict[str, float]:
+            # Everything up to the response start: routing, dependencies, handler, rendering
+            nonlocal stopped
+            profile.disable()
+            stopped = True
+            wall = time.perf_counter() - start
+            stats = pstats.Stats(profile)
+            phases = phase_breakdown(stats, wall, request_stats.db_seconds - db_before, db_by_phase)
+            summary.update(
+                id=trace_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=getattr(scope.get("route"), "path", None),
+                status=status_code,
+                wall_ms=round(wall * 1000, 3),
+                db_statements=request_stats.statements,
+                phases_ms={name: round(seconds * 1000, 3) for name, seconds in phases.items()},
+                top_functions=_top_functions(stats),
+            )
+            return phases
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and not stopped:
+                phases = stop(message["status"])
+                timing = ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in phases.items())
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [
+                        (PROFILE_ID_HEADER.lower().encode(), trace_id.encode()),
+                        (b"server-timing", timing.encode()),
+                    ],
+                }
+            await send(message)
+
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not stopped:
+                stop(500)
+            _phase_db.reset(phase_db_token)
+            _active = False
+            metrics.PROFILED_REQUESTS.inc()
+        await asyncio.to_thread(_write, trace_id, profile, summary)
@@ -0,0 +1,43 @@
+# app/responses.py
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pinned in requirements; the stdlib fallback is much slower
+    orjson = None
+
+# Reported by the benchmarks, whose list timings depend on it
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed.
+
+    The content must already be plain data (dicts, lists, scalars, dates); it
+    is not run through `jsonable_encoder` or a response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_response(rows: Sequence, keys: Iterable[str], headers: Optional[Mapping[str, str]] = None) -> FastJSONResponse:
+    """Serialize result rows (tuples in `keys` order) as a JSON array of objects."""
+    keys = list(keys)
+    return FastJSONResponse([dict(zip(keys, row)) for row in rows], headers=headers)
@@ -0,0 +1,116 @@
+# app/revocation.py
+"""Server-side store of used refresh tokens and revoked token families.
+
+Each refresh token can be redeemed once (`revoked_tokens`); a family, every
+token rotated from one login, can be revoked as a whole
+(`revoked_token_families`). Both tables are shared by every worker. Rows
+live only until the tokens they cover would expire anyway; a background
+task deletes them every REVOKED_TOKEN_PURGE_INTERVAL_SECONDS, which bounds
+the tables by the refresh and logout traffic of one token lifetime.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .database import AsyncSessionLocal
+
+# Seconds between purges of expired entries; 0 disables the background task
+REVOKED_TOKEN_PURGE_INTERVAL_SECONDS = float(os.getenv("REVOKED_TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+# Rows deleted per transaction
+REVOKED_TOKEN_PURGE_BATCH_SIZE = int(os.getenv("REVOKED_TOKEN_PURGE_BATCH_SIZE", "5000"))
+
+logger = logging.getLogger("app.revocation")
+
+_task: Optional[asyncio.Task] = None
+
+
+async def revoke(db: AsyncSession, jti: str, expires_at: datetime) -> bool:
+    """Record `jti` as used and commit; False if it already was.
+
+    The insert is the lookup: of two concurrent redemptions of one token,
+    only one gets past the primary key.
+    """
+    try:
+        await db.execute(insert(models.RevokedToken).values(jti=jti, expires_at=expires_at))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    return True
+
+
+async def family_revoked(db: AsyncSession, family: str) -> bool:
+    revoked = models.RevokedTokenFamily
+    return await db.scalar(select(revoked.family).where(revoked.family == family)) is not None
+
+
+async def revoke_family(db: AsyncSession, family: str, expires_at: datetime) -> None:
+    """Revoke every refresh token of `family` and commit; a no-op if it already is."""
+    try:
+        await db.execute(insert(models.RevokedTokenFamily).values(family=family, expires_at=expires_at))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+
+
+async def _purge(key, expires_at, now: datetime, batch_size: int) -> int:
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            keys = (await db.scalars(select(key).where(expires_at < now).limit(batch_size))).all()
+            if keys:
+                await db.execute(
+                    delete(key.class_).where(key.in_(keys)).execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        total += len(keys)
+        if len(keys) < batch_size:
+            return total
+        await asyncio.sleep(0)  # let requests run between batches
+
+
+async def purge_once(batch_size: int = REVOKED_TOKEN_PURGE_BATCH_SIZE) -> int:
+    """Delete entries for tokens and families that have expired; returns how many went."""
+    now = datetime.utcnow()
+    tokens, families = models.RevokedToken, models.RevokedTokenFamily
+    return (
+        await _purge(tokens.jti, tokens.expires_at, now, batch_size)
+        + await _purge(families.family, families.expires_at, now, batch_size)
+    )
+
+
+async def _run(interval: float) -> None:
+    while True:
+        try:
+            purged = await purge_once()
+            if purged:
+                logger.info("purged %d expired revoked tokens", purged)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("revoked token purge failed")
+        await asyncio.sleep(interval)
+
+
+def start(interval: float = REVOKED_TOKEN_PURGE_INTERVAL_SECONDS) -> None:
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.create_task(_run(interval))
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -8,6 +8,13 @@ from datetime import datetime, timedelta  # ✅ Add this line
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Auth"])
 
+def _hashing_busy(e: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
 async def register(
     user: schemas.UserCreate,
@@ -16,6 +23,8 @@ async def register(
     try:
         db_user = await crud.create_user(db=db, user=user)
         return db_user
+    except auth.HashingBusyError as e:
+        raise _hashing_busy(e)
     except IntegrityError as e:
         # Check if it's email or username duplicate
         if "ix_users_email" in str(e.orig):
@@ -35,15 +44,43 @@ async def login(
     form_data: schemas.UserCreate,  # Reusing for simplicity; better: OAuth2PasswordRequestForm
     db: AsyncSession = Depends(database.get_db)
 ):
-    user = await auth.authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await auth.authenticate_user(db, form_data.username, form_data.password)
+    except auth.HashingBusyError as e:
+        raise _hashing_busy(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return auth.issue_tokens(user.username)
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(
+    body: schemas.RefreshRequest,
+    db: AsyncSession = Depends(database.get_db)
+):
+    # No password check: the refresh token is verified and rotated instead
+    redeemed = await auth.redeem_refresh_token(db, body.refresh_token)
+    if redeemed is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, family = redeemed
+    return auth.issue_tokens(user.username, family)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: schemas.RefreshRequest,
+    db: AsyncSession = Depends(database.get_db)
+):
+    """Revoke the refresh token and every token rotated from the same login."""
+    if not await auth.revoke_refresh_token(db, body.refresh_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
\ No newline at end of file
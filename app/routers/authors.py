@@ -1,8 +1,11 @@
 # app/routers/authors.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from .. import schemas, crud, database, models, auth  # ✅ add models
+from typing import List, Literal, Optional
+from .. import schemas, crud, database, models, auth, export, bulk, http_cache  # ✅ add models
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor
+from ..responses import FastJSONResponse, rows_response
 from fastapi.security import OAuth2PasswordBearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -23,24 +26,64 @@ async def create_author(
 ):
     return await crud.create_author(db=db, author=author)
 
-@router.get("/", response_model=List[schemas.Author])
+@router.post("/import", response_model=schemas.ImportReport)
+async def import_authors(
+    request: Request,
+    db: AsyncSession = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Bulk-load authors from an NDJSON (default) or `text/csv` request body."""
+    return await bulk.run_import(
+        db,
+        request.stream(),
+        request.headers.get("content-type", ""),
+        schemas.AuthorCreate,
+        crud.bulk_create_authors,
+    )
+
+@router.get("/", response_model=List[schemas.Author], response_class=FastJSONResponse)
 async def read_authors(
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(database.get_db),
+    cursor: Optional[str] = None,
+    view: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """List authors; `view=summary` leaves out `bio`. Served from plain rows, like the book list."""
+    columns = crud.AUTHOR_LIST_COLUMNS[view]
+    try:
+        rows = await crud.get_author_rows(db=db, columns=columns, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {}
+    if rows and len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return rows_response(rows, (c.key for c in columns), headers=headers)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_authors(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    return await crud.get_authors(db=db, skip=skip, limit=limit)
+    """Stream every author as NDJSON or CSV."""
+    return export.export_response(models.Author, fmt, "authors")
 
 @router.get("/{author_id}", response_model=schemas.AuthorWithBooks)
 async def read_author(
     author_id: int,
+    request: Request,
+    # Primary, not replica: a lagging replica would refill the cache with the
+    # row as it was before the write that just invalidated it
     db: AsyncSession = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    author = await crud.get_author(db, author_id)
-    if not author:
-        raise HTTPException(status_code=404, detail="Author not found")
-    # Preload books
-    # Note: In real app, use joinedload in query for efficiency
-    return author
\ No newline at end of file
+    cached = http_cache.get("author", author_id)
+    if cached is None:
+        started_at = http_cache.generation()
+        author = await crud.get_author(db, author_id)
+        if not author:
+            raise HTTPException(status_code=404, detail="Author not found")
+        body = schemas.AuthorWithBooks.model_validate(author).model_dump_json().encode("utf-8")
+        cached = http_cache.store("author", author_id, body, started_at)
+    return http_cache.respond(request, cached)
\ No newline at end of file
@@ -1,8 +1,11 @@
 # app/routers/books.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from .. import schemas, crud, database, models, auth
+from typing import List, Literal, Optional, Union
+from .. import schemas, crud, database, models, auth, export, bulk, http_cache, counts, loaders
+from ..responses import FastJSONResponse, rows_response
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor
 
 router = APIRouter(prefix="/api/v1/books", tags=["Books"])
 
@@ -14,37 +17,130 @@ async def create_book(
 ):
     return await crud.create_book(db=db, book=book)
 
-@router.get("/", response_model=List[schemas.Book])
+@router.post("/import", response_model=schemas.ImportReport)
+async def import_books(
+    request: Request,
+    db: AsyncSession = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Bulk-load books from an NDJSON (default) or `text/csv` request body."""
+    return await bulk.run_import(
+        db,
+        request.stream(),
+        request.headers.get("content-type", ""),
+        schemas.BookCreate,
+        crud.bulk_create_books,
+    )
+
+def _parse_ids(raw: str) -> List[int]:
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > schemas.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"ids must list 1 to {schemas.BATCH_MAX_ITEMS} books")
+    return ids
+
+@router.get(
+    "/",
+    response_model=List[Union[schemas.BookDetail, schemas.Book]],
+    response_class=FastJSONResponse,
+)
 async def read_books(
     title: Optional[str] = None,
     author_id: Optional[int] = None,
     available: Optional[bool] = None,
+    q: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(database.get_db),
+    cursor: Optional[str] = None,
+    view: Literal["full", "summary"] = "full",
+    count: bool = False,
+    expand: Optional[Literal["author"]] = None,
+    ids: Optional[str] = Query(None, description="Comma-separated book ids to fetch, e.g. `1,2,3`"),
+    db: AsyncSession = Depends(database.get_read_db),
+    batch: loaders.Loaders = Depends(loaders.get_loaders),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    return await crud.get_books(
-        db=db,
-        skip=skip,
-        limit=limit,
-        title=title,
-        author_id=author_id,
-        available=available
-    )
+    """List books; `view=summary` leaves out `description`.
+
+    Rows are selected as plain columns and serialized directly, skipping ORM
+    entities and per-item response-model validation. With `count=true` the
+    total for these filters comes back in `X-Total-Count`, with
+    `X-Total-Count-Exact: false` when it is an estimate.
+
+    `ids=1,2,3` fetches those books instead (in that order, unknown ids left
+    out; no filters or paging). `expand=author` embeds each book's author, as
+    in `BookDetail`, loaded for the whole page with one extra query.
+    """
+    columns = crud.BOOK_LIST_COLUMNS[view]
+    if ids is not None:
+        if any((title, author_id, available is not None, q, skip, cursor)):
+            raise HTTPException(status_code=400, detail="ids cannot be combined with filters or paging")
+        rows = await crud.get_book_rows_by_ids(db, columns, _parse_ids(ids))
+        headers = counts.headers(counts.Total(len(rows), True)) if count else {}
+        return await _book_list_response(rows, columns, expand, view, batch, headers)
+    try:
+        rows = await crud.get_book_rows(
+            db=db,
+            columns=columns,
+            skip=skip,
+            limit=limit,
+            title=title,
+            author_id=author_id,
+            available=available,
+            cursor=cursor,
+            q=q
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {}
+    if rows and len(rows) == limit and not q:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    if count:
+        total = counts.from_page(skip, limit, cursor, len(rows)) or await counts.book_total(
+            db, title=title, author_id=author_id, available=available, q=q
+        )
+        headers.update(counts.headers(total))
+    return await _book_list_response(rows, columns, expand, view, batch, headers)
+
+async def _book_list_response(rows, columns, expand, view, batch: loaders.Loaders, headers) -> FastJSONResponse:
+    if expand != "author":
+        return rows_response(rows, (c.key for c in columns), headers=headers)
+    keys = [c.key for c in columns]
+    items = [dict(zip(keys, row)) for row in rows]
+    authors = await batch.authors(view).load_many(item["author_id"] for item in items)
+    for item, author in zip(items, authors):
+        item["author"] = author
+    return FastJSONResponse(items, headers=headers)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Stream every book as NDJSON or CSV."""
+    return export.export_response(models.Book, fmt, "books")
 
 @router.get("/{book_id}", response_model=schemas.BookDetail)
 async def read_book(
     book_id: int,
+    request: Request,
+    # Primary, not replica: a lagging replica would refill the cache with the
+    # row as it was before the write that just invalidated it
     db: AsyncSession = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    book = await crud.get_book(db, book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    # Ensure author is loaded
-    await db.refresh(book, ["author"])
-    return book
+    cached = http_cache.get("book", book_id)
+    if cached is None:
+        started_at = http_cache.generation()
+        book = await crud.get_book_detail(db, book_id)
+        if not book:
+            raise HTTPException(status_code=404, detail="Book not found")
+        body = schemas.BookDetail.model_validate(book).model_dump_json().encode("utf-8")
+        cached = http_cache.store("book", book_id, body, started_at)
+    return http_cache.respond(request, cached)
 
 @router.patch("/{book_id}", response_model=schemas.Book)
 async def update_book(
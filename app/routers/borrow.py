@@ -1,8 +1,10 @@
 # app/routers/borrow.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from .. import schemas, crud, database, models, auth
+from typing import List, Literal, Optional
+from .. import schemas, crud, database, models, auth, export
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor
 
 router = APIRouter(prefix="/api/v1", tags=["Borrowing"])
 
@@ -18,6 +20,35 @@ async def borrow_book(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/borrow/batch", response_model=schemas.BatchResult)
+async def borrow_books(
+    batch: schemas.BorrowBatchCreate,
+    db: AsyncSession = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    outcomes = await crud.borrow_books(db=db, book_ids=batch.book_ids, user_id=current_user.id)
+    return _batch_result(outcomes)
+
+@router.post("/return/batch", response_model=schemas.BatchResult)
+async def return_books(
+    batch: schemas.ReturnBatchCreate,
+    db: AsyncSession = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    outcomes = await crud.return_books(db=db, record_ids=batch.record_ids, user_id=current_user.id)
+    return _batch_result(outcomes)
+
+def _batch_result(outcomes) -> schemas.BatchResult:
+    return schemas.BatchResult(results=[
+        schemas.BatchItemResult(
+            id=item_id,
+            ok=error is None,
+            record=schemas.BorrowRecord.model_validate(record) if record is not None else None,
+            error=error,
+        )
+        for item_id, record, error in outcomes
+    ])
+
 @router.post("/return/{record_id}", response_model=schemas.BorrowRecord)
 async def return_book(
     record_id: int,
@@ -25,18 +56,81 @@ async def return_book(
     current_user: models.User = Depends(auth.get_current_user)
 ):
     try:
-        record = await crud.return_book(db=db, record_id=record_id)
+        record = await crud.return_book(db=db, record_id=record_id, user_id=current_user.id)
         if not record:
             raise HTTPException(status_code=404, detail="Borrow record not found")
-        if record.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not your borrow record")
         return record
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/borrow/history", response_model=List[schemas.BorrowRecord])
 async def get_borrow_history(
-    db: AsyncSession = Depends(database.get_db),
+    response: Response,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    # Without `limit` the full history is returned, as before; loans returned
+    # long ago live in the archive and need `include_archived=true`
+    try:
+        records = await crud.get_borrow_history(
+            db=db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor,
+            include_archived=include_archived,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if records and limit is not None and len(records) == limit:
+        last = records[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.borrowed_at, last.id)
+    return records
+
+@router.get("/borrow/overdue", response_model=List[schemas.BorrowRecord])
+async def get_overdue_loans(
+    response: Response,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(database.get_read_db),
+    operator: bool = Depends(auth.is_operator),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Open loans past their due date, most overdue first.
+
+    Patrons see their own; with `X-Operator-Token`, every patron's (or `user_id`'s).
+    """
+    if not operator:
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not allowed to list other users' loans")
+        user_id = current_user.id
+    try:
+        records = await crud.get_overdue_loans(
+            db=db, skip=skip, limit=limit, cursor=cursor, user_id=user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(records) == limit:
+        last = records[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.due_date, last.id)
+    return records
+
+@router.get("/borrow/export", response_class=StreamingResponse)
+async def export_borrow_records(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include_archived: bool = True,
+    operator: bool = Depends(auth.is_operator),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    return await crud.get_borrow_history(db=db, user_id=current_user.id)
\ No newline at end of file
+    """Stream the caller's borrow records as NDJSON or CSV; every patron's with `X-Operator-Token`.
+
+    Loans moved to the archive are included, by id among the rest, unless
+    `include_archived=false`.
+    """
+    archive = models.BorrowRecordArchive if include_archived else None
+    filters = {} if operator else {"user_id": current_user.id}
+    return export.export_response(models.BorrowRecord, fmt, "borrow_records", archive, **filters)
\ No newline at end of file
@@ -0,0 +1,27 @@
+# app/routers/stats.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from .. import schemas, database, models, auth, stats
+
+router = APIRouter(prefix="/api/v1/stats", tags=["Stats"])
+
+@router.get("/", response_model=schemas.CatalogStats)
+async def read_stats(
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Catalog totals and loans/returns per day for the last `days` days."""
+    return await stats.get_stats(db, days=days)
+
+@router.get("/authors", response_model=List[schemas.AuthorBookCount])
+async def read_author_counts(
+    author_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Number of books per author, by author id."""
+    return await stats.get_author_counts(db, skip=skip, limit=limit, author_id=author_id)
@@ -26,6 +26,11 @@ class UserOut(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    # Exchange at POST /api/v1/auth/refresh for a new pair; single use
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Optional[str] = None
@@ -98,8 +103,56 @@ class BorrowRecord(BorrowRecordBase):
     id: int
     borrowed_at: datetime
     returned_at: Optional[datetime] = None
+    overdue_flagged_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+# Kiosk batches: at most this many books per request
+BATCH_MAX_ITEMS = 100
+
+class BorrowBatchCreate(BaseModel):
+    book_ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class ReturnBatchCreate(BaseModel):
+    record_ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class BatchItemResult(BaseModel):
+    id: int  # the book_id / record_id from the request
+    ok: bool
+    record: Optional[BorrowRecord] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    results: List[BatchItemResult]
+
+# ---- Statistics Schemas ----
+class DailyLoans(BaseModel):
+    day: date
+    loans: int
+    returns: int
+
+class CatalogStats(BaseModel):
+    books: int
+    available_books: int
+    active_loans: int
+    loans_per_day: List[DailyLoans] = []
+
+class AuthorBookCount(BaseModel):
+    author_id: int
+    books: int
+
+    class Config:
+        from_attributes = True
+
+# ---- Bulk Import Schemas ----
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []  # capped; `failed` has the full count
+
 AuthorWithBooks.model_rebuild()
\ No newline at end of file
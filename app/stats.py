@@ -0,0 +1,174 @@
+# app/stats.py
+"""Catalog statistics kept up to date by crud, in the same transaction as the change.
+
+    python -m app.stats rebuild
+
+recomputes every counter from the base tables, repairing any drift.
+"""
+import argparse
+import asyncio
+import os
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Date, case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+from .database import AsyncSessionLocal
+
+# Rows the catalog-wide counters are spread over; more slots, less row-lock contention
+STATS_COUNTER_SLOTS = int(os.getenv("STATS_COUNTER_SLOTS", "8"))
+
+
+def _slot() -> int:
+    return random.randrange(STATS_COUNTER_SLOTS)
+
+
+async def _increment(db: AsyncSession, model, key: Iterable[str], rows: List[dict]) -> None:
+    """Add each row's counts to the existing row with the same key, creating it if needed."""
+    if not rows:
+        return
+    # Postgres and SQLite share the ON CONFLICT DO UPDATE syntax
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(model).values(rows)
+    key = list(key)
+    counts = [name for name in rows[0] if name not in key]
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=key,
+        set_={name: getattr(model, name) + stmt.excluded[name] for name in counts},
+    ))
+
+
+async def record_books(db: AsyncSession, books: int = 0, available: int = 0, active_loans: int = 0) -> None:
+    if books or available or active_loans:
+        await _increment(db, models.CatalogCounter, ["slot"], [
+            {"slot": _slot(), "books": books, "available_books": available, "active_loans": active_loans}
+        ])
+
+
+async def record_authors(db: AsyncSession, deltas: Dict[int, int]) -> None:
+    await _increment(db, models.AuthorBookCount, ["author_id"], [
+        {"author_id": author_id, "books": delta}
+        for author_id, delta in sorted(deltas.items()) if delta
+    ])
+
+
+async def record_loans(db: AsyncSession, loans: Iterable[date] = (), returns: Iterable[date] = ()) -> None:
+    """Count loans and returns against the days they happened."""
+    per_day = defaultdict(lambda: [0, 0])
+    for day in loans:
+        per_day[day][0] += 1
+    for day in returns:
+        per_day[day][1] += 1
+    slot = _slot()
+    await _increment(db, models.DailyLoanCount, ["day", "slot"], [
+        {"day": day, "slot": slot, "loans": n_loans, "returns": n_returns}
+        for day, (n_loans, n_returns) in sorted(per_day.items())
+    ])
+
+
+async def get_stats(db: AsyncSession, days: int = 30) -> schemas.CatalogStats:
+    """Totals plus per-day loans for the last `days` days; cost does not grow with the catalog."""
+    totals = (await db.execute(select(
+        func.coalesce(func.sum(models.CatalogCounter.books), 0),
+        func.coalesce(func.sum(models.CatalogCounter.available_books), 0),
+        func.coalesce(func.sum(models.CatalogCounter.active_loans), 0),
+    ))).one()
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    result = await db.execute(
+        select(
+            models.DailyLoanCount.day,
+            func.sum(models.DailyLoanCount.loans),
+            func.sum(models.DailyLoanCount.returns),
+        )
+        .where(models.DailyLoanCount.day >= since)
+        .group_by(models.DailyLoanCount.day)
+        .order_by(models.DailyLoanCount.day)
+    )
+    return schemas.CatalogStats(
+        books=totals[0],
+        available_books=totals[1],
+        active_loans=totals[2],
+        loans_per_day=[
+            schemas.DailyLoans(day=day, loans=loans, returns=returns)
+            for day, loans, returns in result.all()
+        ],
+    )
+
+
+async def get_author_counts(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    author_id: Optional[int] = None
+) -> List[models.AuthorBookCount]:
+    query = select(models.AuthorBookCount).order_by(models.AuthorBookCount.author_id)
+    if author_id is not None:
+        query = query.where(models.AuthorBookCount.author_id == author_id)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def rebuild(db: AsyncSession) -> dict:
+    """Recompute every statistic from books and loans (hot and archived) in one transaction.
+
+    Returns the totals before and after, so drift shows up in the output.
+    """
+    before = (await get_stats(db, days=1)).model_dump(exclude={"loans_per_day"})
+
+    books, available = (await db.execute(select(
+        func.count(models.Book.id),
+        func.coalesce(func.sum(case((models.Book.available.is_(True), 1), else_=0)), 0),
+    ))).one()
+    active_loans = await db.scalar(
+        select(func.count(models.BorrowRecord.id)).where(models.BorrowRecord.returned_at.is_(None))
+    )
+    await db.execute(delete(models.CatalogCounter))
+    await db.execute(insert(models.CatalogCounter).values(
+        slot=0, books=books, available_books=available, active_loans=active_loans
+    ))
+
+    await db.execute(delete(models.AuthorBookCount))
+    await db.execute(insert(models.AuthorBookCount).from_select(
+        ["author_id", "books"],
+        select(models.Book.author_id, func.count(models.Book.id)).group_by(models.Book.author_id),
+    ))
+
+    per_day = defaultdict(lambda: [0, 0])
+    # Archived loans (app/archive.py) still count towards the days they happened on
+    for model in (models.BorrowRecord, models.BorrowRecordArchive):
+        for column, index in ((model.borrowed_at, 0), (model.returned_at, 1)):
+            day = func.date(column, type_=Date)
+            result = await db.execute(
+                select(day, func.count()).where(column.is_not(None)).group_by(day)
+            )
+            for value, count in result.all():
+                per_day[value][index] += count
+    await db.execute(delete(models.DailyLoanCount))
+    if per_day:
+        await db.execute(insert(models.DailyLoanCount), [
+            {"day": day, "slot": 0, "loans": loans, "returns": returns}
+            for day, (loans, returns) in sorted(per_day.items())
+        ])
+    await db.commit()
+
+    after = {"books": books, "available_books": available, "active_loans": active_loans}
+    return {"before": before, "after": after}
+
+
+async def _main(command: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        if command == "rebuild":
+            return await rebuild(db)
+        return (await get_stats(db)).model_dump(mode="json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["rebuild", "show"])
+    args = parser.parse_args()
+    print(asyncio.run(_main(args.command)))
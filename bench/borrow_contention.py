@@ -0,0 +1,44 @@
+# bench/borrow_contention.py
+"""Fire many simultaneous borrows at one book; exactly one may succeed.
+
+    python -m bench.borrow_contention --borrowers 300
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from bench.harness import client, register_and_login, reset_database
+
+
+async def main(borrowers: int, users: int) -> bool:
+    await reset_database()
+    async with client() as c:
+        headers = [await register_and_login(c, f"patron{i}") for i in range(users)]
+        author = await c.post("/api/v1/authors/", json={"name": "Hot Author"}, headers=headers[0])
+        book = await c.post(
+            "/api/v1/books/",
+            json={"title": "Hot Book", "author_id": author.json()["id"]},
+            headers=headers[0],
+        )
+        book_id = book.json()["id"]
+
+        async def borrow(i):
+            r = await c.post("/api/v1/borrow", json={"book_id": book_id}, headers=headers[i % users])
+            return r.status_code
+
+        statuses = await asyncio.gather(*(borrow(i) for i in range(borrowers)))
+        history = await c.get(f"/api/v1/books/{book_id}", headers=headers[0])
+
+    counts = {str(code): statuses.count(code) for code in sorted(set(statuses))}
+    ok = counts.get("201") == 1 and set(counts) <= {"201", "400"} and not history.json()["available"]
+    print(json.dumps({"benchmark": "borrow_contention", "borrowers": borrowers, "statuses": counts, "ok": ok}, indent=2))
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--borrowers", type=int, default=300)
+    parser.add_argument("--users", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.borrowers, args.users)) else 1)
@@ -0,0 +1,45 @@
+# bench/compare.py
+"""Compare two `bench.run` reports endpoint by endpoint.
+
+    python -m bench.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(before: dict, after: dict) -> dict:
+    rows = {}
+    for label in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        b = before["endpoints"].get(label, {})
+        a = after["endpoints"].get(label, {})
+        rows[label] = {
+            metric: {"before": b.get(metric), "after": a.get(metric), "change": _change(b.get(metric, 0), a.get(metric, 0))}
+            for metric in METRICS
+        }
+    return {
+        "before": before.get("git_revision"),
+        "after": after.get("git_revision"),
+        "total_throughput_rps": {
+            "before": before["total"]["throughput_rps"],
+            "after": after["total"]["throughput_rps"],
+            "change": _change(before["total"]["throughput_rps"], after["total"]["throughput_rps"]),
+        },
+        "endpoints": rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+    with open(args.before) as f_before, open(args.after) as f_after:
+        print(json.dumps(compare(json.load(f_before), json.load(f_after)), indent=2))
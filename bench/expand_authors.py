@@ -0,0 +1,65 @@
+# bench/expand_authors.py
+"""A page of books with their authors: one detail request per row vs. `expand=author`.
+
+    python -m bench.expand_authors --limit 100 --pages 20
+
+The old client pattern lists a page, then calls `GET /books/{id}` for every
+row to get `BookDetail.author` (detail cache cleared, as for a cold page).
+The new one asks for `GET /books/?expand=author`. Reports SQL statements,
+HTTP requests and wall time per page for both.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import event
+
+from bench.harness import client, engine, register_and_login
+from bench.seed import SeedConfig, seed
+from app import http_cache
+
+
+async def main(args) -> dict:
+    await seed(SeedConfig(users=5, authors=args.authors, books=args.books, loans=0))
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    async def per_row(c, headers, params):
+        r = await c.get("/api/v1/books/", params=params, headers=headers)
+        for book in r.json():
+            await c.get(f"/api/v1/books/{book['id']}", headers=headers)
+        return 1 + len(r.json())
+
+    async def expanded(c, headers, params):
+        await c.get("/api/v1/books/", params={**params, "expand": "author"}, headers=headers)
+        return 1
+
+    results = {}
+    async with client() as c:
+        headers = await register_and_login(c, "expandbench")
+        for name, fetch_page in (("per_row_detail", per_row), ("expand_author", expanded)):
+            requests = 0
+            statements.clear()
+            start = time.perf_counter()
+            for page in range(args.pages):
+                http_cache.clear()
+                params = {"limit": args.limit, "skip": page * args.limit % args.books}
+                requests += await fetch_page(c, headers, params)
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                "requests_per_page": requests / args.pages,
+                "statements_per_page": len(statements) / args.pages,
+                "ms_per_page": round(elapsed / args.pages * 1000, 2),
+            }
+    return {"benchmark": "expand_authors", "limit": args.limit, "pages": args.pages, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
@@ -0,0 +1,77 @@
+# bench/harness.py
+"""Shared helpers for driving `app.main.app` in-process over an ASGI transport."""
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+# Must be set before `app.database` is imported
+os.environ.setdefault(
+    "DATABASE_URL",
+    "sqlite+aiosqlite:///" + os.path.join(tempfile.gettempdir(), "library_bench.db"),
+)
+
+import httpx
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import Base
+
+if engine.dialect.name == "sqlite":
+    # SQLite has a single writer; let contended writes queue instead of failing after 5s
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_busy_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA busy_timeout = 60000")
+        cursor.close()
+
+
+async def reset_database():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def client() -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+
+
+async def register_and_login(c: httpx.AsyncClient, username: str, password: str = "BenchPass123!") -> Dict[str, str]:
+    await c.post(
+        "/api/v1/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": password},
+    )
+    r = await c.post(
+        "/api/v1/auth/login",
+        json={"username": username, "email": f"{username}@example.com", "password": password},
+    )
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (milliseconds) for one endpoint."""
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+async def timed(samples: List[float], coro):
+    start = time.perf_counter()
+    response = await coro
+    samples.append(time.perf_counter() - start)
+    return response
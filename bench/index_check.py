@@ -0,0 +1,164 @@
+# bench/index_check.py
+"""Check that the hot crud.py queries are served by an index, not a table scan.
+
+    python -m bench.index_check
+
+Seeds a small catalog, runs each crud call once while capturing the SQL it
+issues, and asks the database for the plan of every statement (EXPLAIN QUERY
+PLAN on SQLite, EXPLAIN with sequential scans discouraged on PostgreSQL).
+A check fails if any plan scans a whole table, or if the index it is meant to
+use does not appear. Exits non-zero on failure.
+"""
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from bench.harness import engine
+from bench.seed import SeedConfig, seed
+from app import archive, crud, models, schemas
+from app.database import AsyncSessionLocal
+from app.pagination import encode_cursor
+
+
+async def _history_page(db):
+    return await crud.get_borrow_history(db, user_id=1, limit=20)
+
+
+async def _history_next_page(db):
+    last = (await crud.get_borrow_history(db, user_id=1, limit=20))[-1]
+    return await crud.get_borrow_history(
+        db, user_id=1, limit=20, cursor=encode_cursor(last.borrowed_at, last.id)
+    )
+
+
+async def _full_history_page(db):
+    return await crud.get_borrow_history(db, user_id=1, limit=20, include_archived=True)
+
+
+async def _archive_batch(db):
+    return await archive.archive_once(after_days=365, batch_size=100)
+
+
+async def _books_by_author_available(db):
+    return await crud.get_book_rows(
+        db, crud.BOOK_LIST_COLUMNS["full"], author_id=1, available=True, limit=50
+    )
+
+
+async def _books_by_author(db):
+    return await crud.get_books(db, author_id=1, limit=50)
+
+
+async def _overdue(db):
+    return await crud.get_overdue_loans(db, limit=50)
+
+
+async def _overdue_for_user(db):
+    # What a patron without the operator token gets
+    return await crud.get_overdue_loans(db, limit=50, user_id=1)
+
+
+async def _return(db):
+    record_id = await db.scalar(
+        models.BorrowRecord.__table__.select()
+        .with_only_columns(models.BorrowRecord.id)
+        .where(models.BorrowRecord.returned_at.is_(None))
+        .limit(1)
+    )
+    return await crud.return_book(db, record_id)
+
+
+async def _delete_book(db):
+    # Deleting a book first looks up its loans by book_id
+    book = await crud.create_book(db, schemas.BookCreate(title="Index Check", author_id=1))
+    return await crud.delete_book(db, book.id)
+
+
+# (label, crud call, index its plan must use, or None for "any index, no scans")
+CHECKS = [
+    ("get_borrow_history", _history_page, "ix_borrow_records_user_borrowed"),
+    ("get_borrow_history cursor", _history_next_page, "ix_borrow_records_user_borrowed"),
+    ("get_book_rows author_id+available", _books_by_author_available, "ix_books_author_available"),
+    ("get_books author_id", _books_by_author, "ix_books_author_available"),
+    ("get_overdue_loans", _overdue, "ix_borrow_records_open_due"),
+    ("get_overdue_loans user_id", _overdue_for_user, None),
+    ("return_book", _return, None),
+    ("delete_book", _delete_book, "ix_borrow_records_book_id"),
+    ("get_borrow_history include_archived", _full_history_page, "ix_borrow_records_archive_user_borrowed"),
+    ("archive_once", _archive_batch, "ix_borrow_records_returned_at"),
+]
+
+
+def _full_scans(dialect: str, plan: str) -> list:
+    lines = plan.splitlines()
+    if dialect == "sqlite":
+        # "SCAN books" is a table scan; "SCAN books USING INDEX ..." walks an index,
+        # and scans of subqueries (already cut down by LIMIT) don't count
+        return [
+            line for line in lines
+            if line.split()[:1] == ["SCAN"] and " USING " not in line
+            and line.split()[1] in models.Base.metadata.tables
+        ]
+    return [line for line in lines if "Seq Scan" in line]
+
+
+async def _explain(conn, dialect: str, statement: str, parameters) -> str:
+    if dialect == "sqlite":
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(row[-1] for row in result)
+    await conn.exec_driver_sql("SET enable_seqscan = off")
+    result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+
+async def main() -> bool:
+    await seed(SeedConfig(users=20, authors=100, books=5000, loans=20000))
+    # Make sure some open loans are already overdue
+    async with engine.begin() as conn:
+        await conn.execute(
+            models.BorrowRecord.__table__.update()
+            .where(models.BorrowRecord.returned_at.is_(None))
+            .values(due_date=datetime.utcnow() - timedelta(days=1))
+        )
+
+    dialect = engine.dialect.name
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    results = {}
+    ok = True
+    for label, call, index in CHECKS:
+        captured.clear()
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            async with AsyncSessionLocal() as db:
+                await call(db)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        plans = []
+        async with engine.connect() as conn:
+            for statement, parameters in captured:
+                plans.append(await _explain(conn, dialect, statement, parameters))
+            await conn.rollback()
+        scans = [line for plan in plans for line in _full_scans(dialect, plan)]
+        passed = bool(plans) and not scans and (index is None or any(index in plan for plan in plans))
+        ok = ok and passed
+        results[label] = {"index": index, "statements": len(plans), "ok": passed}
+        if not passed:
+            results[label]["plans"] = [
+                {"sql": statement, "plan": plan} for (statement, _), plan in zip(captured, plans)
+            ]
+
+    print(json.dumps({"benchmark": "index_check", "dialect": dialect, "ok": ok, "checks": results}, indent=2))
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,114 @@
+# bench/lean_lists.py
+"""CPU cost per list page: ORM + response-model pipeline vs. projected rows + fast JSON.
+
+    python -m bench.lean_lists --books 5000 --limit 100 --pages 200
+
+For books and authors, builds the same page both ways in-process and reports
+CPU milliseconds per page. The old way loads entities, validates them through
+`List[schemas.X]` and renders with the stock JSONResponse. The lean way, which
+the list endpoints now use, selects columns, zips rows into dicts and renders
+with FastJSONResponse. Also checks that both produce the same JSON, and times
+`GET /books/` over HTTP in both views.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from bench.harness import client, register_and_login
+from bench.seed import SeedConfig, seed
+from app import crud, schemas
+from app.database import AsyncSessionLocal
+from app.responses import JSON_ENCODER, rows_response
+
+
+async def _cpu_per_page(build, pages: int) -> float:
+    # process_time counts every thread, so both variants include the same query
+    # cost (aiosqlite runs statements on its own thread) and differ in the rest
+    start = time.process_time()
+    for page in range(pages):
+        await build(page)
+    return (time.process_time() - start) / pages * 1000
+
+
+async def _compare(load_entities, load_rows, columns, adapter, pages, limit) -> dict:
+    async with AsyncSessionLocal() as db:
+        async def orm_page(page):
+            items = await load_entities(db, skip=page * limit % 1000, limit=limit)
+            validated = adapter.validate_python(items, from_attributes=True)
+            db.expunge_all()
+            return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+        async def lean_page(page):
+            rows = await load_rows(db, columns=columns, skip=page * limit % 1000, limit=limit)
+            return rows_response(rows, (c.key for c in columns)).body
+
+        same = json.loads(await orm_page(0)) == json.loads(await lean_page(0))
+        orm_ms = await _cpu_per_page(orm_page, pages)
+        lean_ms = await _cpu_per_page(lean_page, pages)
+    return {
+        "same_output": same,
+        "orm_cpu_ms_per_page": round(orm_ms, 3),
+        "lean_cpu_ms_per_page": round(lean_ms, 3),
+        "saving": f"{(orm_ms - lean_ms) / orm_ms * 100:.1f}%" if orm_ms else "n/a",
+    }
+
+
+async def _http(pages: int, limit: int) -> dict:
+    views = ("full", "summary")
+    samples = {view: [] for view in views}
+    sizes = {}
+    async with client() as c:
+        headers = await register_and_login(c, "leanbench")
+        # Views alternate page by page so warm-up and drift affect both alike
+        for page in range(-10, pages):  # the first ten warm up and are dropped
+            for view in views:
+                start = time.process_time()
+                r = await c.get(
+                    "/api/v1/books/",
+                    params={"limit": limit, "skip": page * limit % 1000, "view": view},
+                    headers=headers,
+                )
+                if page >= 0:
+                    samples[view].append(time.process_time() - start)
+                sizes[view] = len(r.content)
+    return {
+        view: {
+            "cpu_ms_per_request": round(sum(samples[view]) / len(samples[view]) * 1000, 3),
+            "bytes_per_page": sizes[view],
+        }
+        for view in views
+    }
+
+
+async def main(args) -> dict:
+    await seed(SeedConfig(users=5, authors=args.authors, books=args.books, loans=0))
+    return {
+        "benchmark": "lean_lists",
+        "json_encoder": JSON_ENCODER,
+        "limit": args.limit,
+        "pages": args.pages,
+        "books": await _compare(
+            crud.get_books, crud.get_book_rows, crud.BOOK_LIST_COLUMNS["full"],
+            TypeAdapter(List[schemas.Book]), args.pages, args.limit,
+        ),
+        "authors": await _compare(
+            crud.get_authors, crud.get_author_rows, crud.AUTHOR_LIST_COLUMNS["full"],
+            TypeAdapter(List[schemas.Author]), args.pages, args.limit,
+        ),
+        "http_books": await _http(args.pages, args.limit),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--authors", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
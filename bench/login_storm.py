@@ -0,0 +1,66 @@
+# bench/login_storm.py
+"""Read latency with and without a concurrent burst of logins.
+
+    python -m bench.login_storm --logins 200 --reads 400
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bench.harness import client, register_and_login, reset_database, summarize, timed
+
+
+async def _reads(c, headers, count, samples):
+    start = time.perf_counter()
+    for _ in range(count):
+        await timed(samples, c.get("/api/v1/books/", headers=headers))
+    return time.perf_counter() - start
+
+
+async def _login_storm(c, count, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    statuses = {}
+
+    async def one():
+        async with sem:
+            r = await c.post(
+                "/api/v1/auth/login",
+                json={"username": "storm", "email": "storm@example.com", "password": "BenchPass123!"},
+            )
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    await asyncio.gather(*(one() for _ in range(count)))
+    return statuses
+
+
+async def main(logins: int, reads: int, concurrency: int):
+    await reset_database()
+    async with client() as c:
+        headers = await register_and_login(c, "reader")
+        await register_and_login(c, "storm")
+
+        baseline = []
+        baseline_elapsed = await _reads(c, headers, reads, baseline)
+
+        during = []
+        storm_elapsed, statuses = await asyncio.gather(
+            _reads(c, headers, reads, during),
+            _login_storm(c, logins, concurrency),
+        )
+
+    print(json.dumps({
+        "benchmark": "login_storm",
+        "reads_baseline": summarize(baseline, baseline_elapsed),
+        "reads_during_storm": summarize(during, storm_elapsed),
+        "login_statuses": statuses,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.reads, args.concurrency))
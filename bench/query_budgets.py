@@ -0,0 +1,126 @@
+# bench/query_budgets.py
+"""Check that each endpoint stays within its SQL statement budget.
+
+    python -m bench.query_budgets
+
+Runs every endpoint once against a small fixture with strict lazy loading on
+and the detail and count caches cleared, counts the statements it issues and exits
+non-zero if any endpoint goes over budget or fails. Tighten a budget when a
+query shape improves; raise one only with a reason. Requests carry an Origin,
+and the headers in EXPOSED must come back readable by cross-origin scripts.
+"""
+import asyncio
+import json
+import sys
+
+from sqlalchemy import event
+
+from bench.harness import client, engine, register_and_login, reset_database
+from app import counts, database, http_cache
+from app.pagination import NEXT_CURSOR_HEADER
+
+# (label, method, url, request kwargs, expected status, max statements).
+# Request kwargs may be a function of the fixtures set up in main().
+# Counts assume a warm token cache, so the auth lookup is not included.
+# Writes that change the catalog also pay for two statistics upserts (app/stats.py).
+BUDGETS = [
+    ("POST /auth/register", "POST", "/api/v1/auth/register",
+     {"json": {"username": "budget2", "email": "budget2@example.com", "password": "BenchPass123!"}}, 201, 2),
+    ("POST /auth/login", "POST", "/api/v1/auth/login",
+     {"json": {"username": "budget2", "email": "budget2@example.com", "password": "BenchPass123!"}}, 200, 1),
+    ("POST /auth/refresh", "POST", "/api/v1/auth/refresh",
+     lambda fixtures: {"json": {"refresh_token": fixtures["refresh_token"]}}, 200, 3),
+    ("POST /auth/logout", "POST", "/api/v1/auth/logout",
+     lambda fixtures: {"json": {"refresh_token": fixtures["logout_token"]}}, 204, 1),
+    ("POST /authors/", "POST", "/api/v1/authors/", {"json": {"name": "Budget Author"}}, 201, 2),
+    ("GET /authors/", "GET", "/api/v1/authors/", {}, 200, 1),
+    ("GET /authors/{id}", "GET", "/api/v1/authors/1", {}, 200, 2),
+    ("POST /books/", "POST", "/api/v1/books/", {"json": {"title": "Budget Book", "author_id": 1}}, 201, 4),
+    ("GET /books/", "GET", "/api/v1/books/", {"params": {"available": True}}, 200, 1),
+    ("GET /books/?q=", "GET", "/api/v1/books/", {"params": {"q": "budget"}}, 200, 1),
+    ("GET /books/?expand=author", "GET", "/api/v1/books/", {"params": {"expand": "author"}}, 200, 2),
+    ("GET /books/?ids=", "GET", "/api/v1/books/", {"params": {"ids": "1,2", "expand": "author"}}, 200, 2),
+    ("GET /books/?count=", "GET", "/api/v1/books/", {"params": {"title": "book", "limit": 1, "count": True}}, 200, 2),
+    ("GET /books/{id}", "GET", "/api/v1/books/1", {}, 200, 1),
+    ("PATCH /books/{id}", "PATCH", "/api/v1/books/1", {"json": {"title": "Budget Book 2"}}, 200, 3),
+    ("POST /borrow", "POST", "/api/v1/borrow", {"json": {"book_id": 1}}, 201, 4),
+    ("GET /borrow/history", "GET", "/api/v1/borrow/history", {"params": {"limit": 1}}, 200, 1),
+    ("GET /borrow/history?include_archived", "GET", "/api/v1/borrow/history",
+     {"params": {"limit": 10, "include_archived": True}}, 200, 1),
+    ("GET /borrow/overdue", "GET", "/api/v1/borrow/overdue", {"params": {"limit": 10}}, 200, 1),
+    ("POST /return/{id}", "POST", "/api/v1/return/1", {}, 200, 4),
+    ("POST /borrow/batch", "POST", "/api/v1/borrow/batch", {"json": {"book_ids": [1, 99]}}, 200, 5),
+    ("POST /return/batch", "POST", "/api/v1/return/batch", {"json": {"record_ids": [2, 99]}}, 200, 5),
+    ("GET /stats/", "GET", "/api/v1/stats/", {}, 200, 2),
+    ("GET /stats/authors", "GET", "/api/v1/stats/authors", {}, 200, 1),
+    ("DELETE /books/{id}", "DELETE", "/api/v1/books/2", {}, 204, 5),
+]
+
+ORIGIN = "http://ui.example"
+# label -> response headers a browser client on another origin has to read
+EXPOSED = {
+    "GET /books/?count=": (NEXT_CURSOR_HEADER, counts.TOTAL_COUNT_HEADER, counts.TOTAL_COUNT_EXACT_HEADER),
+    "GET /borrow/history": (NEXT_CURSOR_HEADER,),
+}
+
+
+def unexposed(label: str, response) -> list:
+    """Headers from EXPOSED[label] missing from the response or hidden by CORS."""
+    exposed = {
+        name.strip().lower()
+        for name in response.headers.get("access-control-expose-headers", "").split(",")
+    }
+    return [
+        name for name in EXPOSED.get(label, ())
+        if name not in response.headers or name.lower() not in exposed
+    ]
+
+
+async def main() -> bool:
+    database.enable_strict_loading()
+    await reset_database()
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    results = {}
+    ok = True
+    async with client() as c:
+        headers = {**await register_and_login(c, "budget"), "Origin": ORIGIN}
+        # Fixture: author 1 and book 1; the budgeted calls create author 2 and book 2
+        await c.post("/api/v1/authors/", json={"name": "Fixture Author"}, headers=headers)
+        await c.post("/api/v1/books/", json={"title": "Fixture Book", "author_id": 1}, headers=headers)
+        login = await c.post(
+            "/api/v1/auth/login",
+            json={"username": "budget", "email": "budget@example.com", "password": "BenchPass123!"},
+        )
+        logout_login = await c.post(
+            "/api/v1/auth/login",
+            json={"username": "budget", "email": "budget@example.com", "password": "BenchPass123!"},
+        )
+        fixtures = {
+            "refresh_token": login.json()["refresh_token"],
+            "logout_token": logout_login.json()["refresh_token"],
+        }
+        for label, method, url, kwargs, expected_status, budget in BUDGETS:
+            http_cache.clear()
+            counts.clear()
+            if callable(kwargs):
+                kwargs = kwargs(fixtures)
+            statements.clear()
+            r = await c.request(method, url, headers=headers, **kwargs)
+            missing = unexposed(label, r)
+            passed = r.status_code == expected_status and len(statements) <= budget and not missing
+            ok = ok and passed
+            results[label] = {"status": r.status_code, "statements": len(statements), "budget": budget, "ok": passed}
+            if missing:
+                results[label]["unexposed_headers"] = missing
+            if not passed:
+                results[label]["sql"] = list(statements)
+                results[label]["body"] = r.text[:500]
+
+    print(json.dumps({"benchmark": "query_budgets", "ok": ok, "endpoints": results}, indent=2))
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,164 @@
+# bench/run.py
+"""Mixed-workload benchmark over every router, with per-endpoint latency.
+
+    python -m bench.run --duration 20 --concurrency 16 --output results.json
+
+Seeds a fresh database (see bench/seed.py), then runs `--concurrency` virtual
+clients for `--duration` seconds. Each one picks operations by weight: logins,
+catalog listing and search, detail reads, borrow history and borrow/return churn.
+Prints one JSON document; compare two of them with `python -m bench.compare`.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from bench.harness import client, summarize
+from bench.seed import PASSWORD, WORDS, SeedConfig, seed, username
+from app.responses import JSON_ENCODER
+
+# (endpoint label, weight)
+WORKLOAD = [
+    ("POST /auth/login", 2),
+    ("GET /books/", 15),
+    ("GET /books/?q=", 10),
+    ("GET /books/?title=", 5),
+    ("GET /books/{id}", 25),
+    ("GET /authors/", 5),
+    ("GET /authors/{id}", 10),
+    ("GET /borrow/history", 8),
+    ("POST /borrow + POST /return/{id}", 10),
+]
+
+
+class VirtualClient:
+    def __init__(self, c, rng: random.Random, config: SeedConfig, samples, statuses):
+        self.c = c
+        self.rng = rng
+        self.config = config
+        self.samples = samples
+        self.statuses = statuses
+        self.headers = None
+
+    async def _call(self, label, method, url, **kwargs):
+        start = time.perf_counter()
+        response = await self.c.request(method, url, **kwargs)
+        self.samples[label].append(time.perf_counter() - start)
+        self.statuses[label][response.status_code] += 1
+        return response
+
+    async def login(self, label="POST /auth/login"):
+        name = username(self.rng.randrange(self.config.users))
+        r = await self._call(
+            label, "POST", "/api/v1/auth/login",
+            json={"username": name, "email": f"{name}@example.com", "password": PASSWORD},
+        )
+        if r.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    async def step(self, label):
+        rng, h = self.rng, self.headers
+        if label == "POST /auth/login":
+            await self.login()
+        elif label == "GET /books/":
+            params = {"limit": 20, "skip": rng.randrange(0, 200)}
+            if rng.random() < 0.5:
+                params["available"] = True
+            await self._call(label, "GET", "/api/v1/books/", params=params, headers=h)
+        elif label == "GET /books/?q=":
+            q = " ".join(rng.sample(WORDS, 2))
+            await self._call(label, "GET", "/api/v1/books/", params={"q": q, "limit": 20}, headers=h)
+        elif label == "GET /books/?title=":
+            await self._call(label, "GET", "/api/v1/books/", params={"title": rng.choice(WORDS), "limit": 20}, headers=h)
+        elif label == "GET /books/{id}":
+            await self._call(label, "GET", f"/api/v1/books/{rng.randint(1, self.config.books)}", headers=h)
+        elif label == "GET /authors/":
+            await self._call(label, "GET", "/api/v1/authors/", params={"limit": 20, "skip": rng.randrange(0, 100)}, headers=h)
+        elif label == "GET /authors/{id}":
+            await self._call(label, "GET", f"/api/v1/authors/{rng.randint(1, self.config.authors)}", headers=h)
+        elif label == "GET /borrow/history":
+            await self._call(label, "GET", "/api/v1/borrow/history", params={"limit": 50}, headers=h)
+        else:
+            r = await self._call(
+                "POST /borrow", "POST", "/api/v1/borrow",
+                json={"book_id": rng.randint(1, self.config.books)}, headers=h,
+            )
+            if r.status_code == 201:
+                await self._call("POST /return/{id}", "POST", f"/api/v1/return/{r.json()['id']}", headers=h)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(args) -> dict:
+    config = SeedConfig(users=args.users, authors=args.authors, books=args.books, loans=args.loans, seed=args.seed)
+    seed_start = time.perf_counter()
+    await seed(config)
+    seed_seconds = time.perf_counter() - seed_start
+
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    labels, weights = zip(*WORKLOAD)
+
+    async with client() as c:
+        clients = [
+            VirtualClient(c, random.Random(args.seed + i), config, samples, statuses)
+            for i in range(args.concurrency)
+        ]
+        for vc in clients:
+            await vc.login(label="warmup login")
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+
+        async def worker(vc):
+            while time.perf_counter() < deadline:
+                await vc.step(vc.rng.choices(labels, weights)[0])
+
+        await asyncio.gather(*(worker(vc) for vc in clients))
+        elapsed = time.perf_counter() - start
+
+    samples.pop("warmup login", None)
+    statuses.pop("warmup login", None)
+    total = sum(len(s) for s in samples.values())
+    return {
+        "benchmark": "mixed",
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "json_encoder": JSON_ENCODER,
+        "config": {**vars(args), "seed_seconds": round(seed_seconds, 2)},
+        "total": {"requests": total, "throughput_rps": round(total / elapsed, 2), "elapsed_s": round(elapsed, 2)},
+        "endpoints": {
+            label: {**summarize(samples[label], elapsed), "statuses": dict(statuses[label])}
+            for label in sorted(samples)
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of measured load")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--loans", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,119 @@
+# bench/seed.py
+"""Deterministic data generator for benchmarks.
+
+    python -m bench.seed --users 100 --authors 500 --books 20000 --loans 50000
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+from bench.harness import engine, reset_database
+from app import auth, models, stats
+from app.database import AsyncSessionLocal
+
+PASSWORD = "BenchPass123!"
+WORDS = (
+    "dragon wizard river empire shadow garden winter machine ocean silent crown "
+    "forest glass memory storm golden city letter night stone journey secret"
+).split()
+
+
+@dataclass
+class SeedConfig:
+    users: int = 100
+    authors: int = 500
+    books: int = 20000
+    loans: int = 50000
+    seed: int = 42
+    batch_size: int = 5000
+
+
+def _title(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+
+
+def username(i: int) -> str:
+    return f"user{i}"
+
+
+async def _insert(conn, model, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        await conn.execute(insert(model), rows[start:start + batch_size])
+
+
+async def seed(config: SeedConfig) -> dict:
+    """Recreate the schema and fill it; returns the config that was used."""
+    rng = random.Random(config.seed)
+    await reset_database()
+    # One hash for everyone: seeding should not spend minutes in bcrypt
+    hashed = auth.get_password_hash(PASSWORD)
+    now = datetime.utcnow()
+
+    users = [
+        {"username": username(i), "email": f"{username(i)}@example.com", "hashed_password": hashed}
+        for i in range(config.users)
+    ]
+    authors = [
+        {
+            "name": f"Author {i}",
+            "bio": " ".join(rng.choice(WORDS) for _ in range(40)),
+            "birth_date": date(1900, 1, 1) + timedelta(days=rng.randint(0, 36500)),
+        }
+        for i in range(config.authors)
+    ]
+    books = [
+        {
+            "title": _title(rng),
+            "isbn": f"978-{i:010d}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+            "published_date": date(1950, 1, 1) + timedelta(days=rng.randint(0, 27000)),
+            "available": True,
+            "author_id": rng.randint(1, config.authors),
+        }
+        for i in range(config.books)
+    ]
+
+    # Mostly returned loans; about one book in ten is currently out
+    loans = []
+    on_loan = set(rng.sample(range(1, config.books + 1), min(config.books // 10, config.loans)))
+    for book_id in on_loan:
+        borrowed_at = now - timedelta(days=rng.randint(0, 30))
+        loans.append({
+            "user_id": rng.randint(1, config.users),
+            "book_id": book_id,
+            "borrowed_at": borrowed_at,
+            "due_date": borrowed_at + timedelta(days=14),
+            "returned_at": None,
+        })
+        books[book_id - 1]["available"] = False
+    while len(loans) < config.loans:
+        borrowed_at = now - timedelta(days=rng.randint(31, 3650), seconds=rng.randint(0, 86400))
+        loans.append({
+            "user_id": rng.randint(1, config.users),
+            "book_id": rng.randint(1, config.books),
+            "borrowed_at": borrowed_at,
+            "due_date": borrowed_at + timedelta(days=14),
+            "returned_at": borrowed_at + timedelta(days=rng.randint(1, 20)),
+        })
+
+    async with engine.begin() as conn:
+        await _insert(conn, models.User, users, config.batch_size)
+        await _insert(conn, models.Author, authors, config.batch_size)
+        await _insert(conn, models.Book, books, config.batch_size)
+        await _insert(conn, models.BorrowRecord, loans, config.batch_size)
+    # Rows went in underneath crud, so build the statistics from scratch
+    async with AsyncSessionLocal() as db:
+        await stats.rebuild(db)
+    return asdict(config)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for field, default in asdict(SeedConfig()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args()
+    print(asyncio.run(seed(SeedConfig(**vars(args)))))
@@ -0,0 +1,70 @@
+# bench/settings_check.py
+"""Check that settings in `.env` reach every module that reads them.
+
+    python -m bench.settings_check
+
+Modules read their settings from os.environ at import time, so `.env` has
+to be loaded before the first of them is imported. This writes a `.env`
+with unusual values to a temporary directory, imports app.main from there
+in a fresh interpreter (the way uvicorn does), and compares what each module
+ended up with. Exits non-zero if any value is missing.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# setting -> (module that reads it, value written to .env, value the module should hold)
+SETTINGS = {
+    "SLOW_QUERY_MS": ("app.metrics", "123", "123"),
+    "ADMISSION_QUEUE_LIMIT": ("app.admission", "7", 7),
+    "RATE_LIMIT_BURST": ("app.admission", "7", 7),
+    "AUTH_CACHE_SIZE": ("app.auth", "7", 7),
+    "HASH_QUEUE_LIMIT": ("app.auth", "7", 7),
+    "DETAIL_CACHE_SIZE": ("app.http_cache", "7", 7),
+    "IMPORT_BATCH_SIZE": ("app.bulk", "7", 7),
+    "EXPORT_YIELD_PER": ("app.export", "7", 7),
+    "COUNT_EXACT_LIMIT": ("app.counts", "7", 7),
+    "PROFILE_MAX_TRACES": ("app.profiling", "7", 7),
+    "DB_POOL_SIZE": ("app.database", "7", 7),
+}
+
+PROBE = """
+import importlib, json, sys
+import app.main
+settings = json.loads(sys.argv[1])
+print(json.dumps({
+    name: getattr(importlib.import_module(module), name) for name, (module, _, _) in settings.items()
+}))
+"""
+
+
+def main() -> bool:
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, ".env"), "w") as f:
+            f.write(f"DATABASE_URL=sqlite+aiosqlite:///{workdir}/settings_check.db\n")
+            for name, (_, value, _) in SETTINGS.items():
+                f.write(f"{name}={value}\n")
+        # Only .env may supply these; the real environment would win over it
+        env = {
+            key: value for key, value in os.environ.items()
+            if key not in SETTINGS and key not in ("DATABASE_URL", "APP_ENV")
+        }
+        env["PYTHONPATH"] = os.getcwd()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE, json.dumps(SETTINGS)],
+            cwd=workdir, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    loaded = json.loads(output.strip().splitlines()[-1])
+
+    results = {}
+    for name, (module, _, expected) in SETTINGS.items():
+        results[name] = {"module": module, "expected": expected, "loaded": loaded[name], "ok": loaded[name] == expected}
+    ok = all(result["ok"] for result in results.values())
+    print(json.dumps({"benchmark": "settings_check", "ok": ok, "settings": results}, indent=2))
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,104 @@
+# bench/startup.py
+"""Cold-start cost of a worker in development vs. production startup mode.
+
+    python -m bench.startup --runs 5
+
+Each run starts a fresh interpreter and measures importing `app.main`, running
+the startup handlers, the first `/openapi.json` request and the first database
+round trip. Modes: development (create_all at boot), production (no DDL, warm
+pool, OpenAPI built at boot) and production with an OpenAPI file written at
+build time (`python -m app.openapi`). Reports the median of each phase.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.harness import reset_database
+
+# Runs in the child interpreter; prints one JSON line of timings in ms
+CHILD = r"""
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+from app import database
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    from sqlalchemy import text
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            r = await c.get("/openapi.json")
+            r.raise_for_status()
+        openapi = time.perf_counter()
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        query = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "startup_ms": (started - imported) * 1000,
+        "first_openapi_ms": (openapi - started) * 1000,
+        "first_query_ms": (query - openapi) * 1000,
+    }))
+
+asyncio.run(main())
+"""
+
+PHASES = ("process_ms", "import_ms", "startup_ms", "first_openapi_ms", "first_query_ms")
+
+
+def _run_child(env: dict) -> dict:
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, "-c", CHILD], env=env, text=True)
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main(args) -> dict:
+    # Production mode does no DDL, so the schema has to exist beforehand
+    asyncio.run(reset_database())
+    base_env = {
+        **os.environ,
+        "PYTHONPATH": os.getcwd(),
+        "DATABASE_URL": os.environ["DATABASE_URL"],
+        "OVERDUE_SWEEP_INTERVAL_SECONDS": "0",
+        "ARCHIVE_INTERVAL_SECONDS": "0",
+        "REVOKED_TOKEN_PURGE_INTERVAL_SECONDS": "0",
+    }
+    openapi_path = os.path.join(tempfile.gettempdir(), "library_openapi.json")
+    subprocess.check_call([sys.executable, "-m", "app.openapi", openapi_path], env=base_env)
+
+    modes = {
+        "development": {"APP_ENV": "development"},
+        "production": {"APP_ENV": "production"},
+        "production+prebuilt_openapi": {"APP_ENV": "production", "OPENAPI_SCHEMA_PATH": openapi_path},
+    }
+    samples = {mode: [] for mode in modes}
+    for _ in range(args.runs):
+        # Interleave modes so disk cache and machine noise hit them alike
+        for mode, extra in modes.items():
+            samples[mode].append(_run_child({**base_env, **extra}))
+    return {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "modes": {
+            mode: {phase: round(statistics.median(s[phase] for s in runs), 2) for phase in PHASES}
+            for mode, runs in samples.items()
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(main(args), indent=2))
@@ -0,0 +1,138 @@
+# bench/statement_cache.py
+"""Per-call overhead of the hot crud queries: rebuilt statements vs. cached ones.
+
+    python -m bench.statement_cache --calls 2000
+
+For each query, the "rebuilt" variant constructs its statement on every call,
+as crud.py used to; the "cached" variant is the current crud function, which
+reuses a statement built once with bind parameters. Reports microseconds per
+call for statement preparation alone (construction plus SQL cache-key
+generation, no database) and for the whole call against the bench database.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import select, tuple_
+
+from bench.seed import SeedConfig, seed, username
+from app import crud, models
+from app.database import AsyncSessionLocal
+from app.pagination import encode_cursor
+
+
+# The statements as crud.py built them before they were cached
+def _user_by_username(name):
+    return select(models.User).where(models.User.username == name)
+
+
+def _book(book_id):
+    return select(models.Book).where(models.Book.id == book_id)
+
+
+def _books(author_id, available, limit):
+    return (
+        select(*crud.BOOK_LIST_COLUMNS["full"])
+        .order_by(models.Book.id)
+        .where(models.Book.author_id == author_id)
+        .where(models.Book.available == available)
+        .offset(0)
+        .limit(limit)
+    )
+
+
+def _history(user_id, last, limit):
+    return (
+        select(models.BorrowRecord)
+        .where(models.BorrowRecord.user_id == user_id)
+        .order_by(models.BorrowRecord.borrowed_at.desc(), models.BorrowRecord.id.desc())
+        .where(tuple_(models.BorrowRecord.borrowed_at, models.BorrowRecord.id) < tuple_(*last))
+        .limit(limit)
+    )
+
+
+def _prep_us(build, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        build()._generate_cache_key()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def _call_us(call, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def main(args) -> dict:
+    await seed(SeedConfig(users=20, authors=100, books=5000, loans=20000))
+    results = {}
+    async with AsyncSessionLocal() as db:
+        last = (await crud.get_borrow_history(db, user_id=1, limit=10))[-1]
+        cursor = encode_cursor(last.borrowed_at, last.id)
+        history_params = {"user_id": 1, "last_borrowed_at": last.borrowed_at, "last_id": last.id, "limit": 10}
+        columns = crud.BOOK_LIST_COLUMNS["full"]
+        name = username(3)
+
+        async def rows(stmt):
+            return (await db.execute(stmt)).all()
+
+        cases = {
+            "get_user_by_username": (
+                lambda: _user_by_username(name),
+                lambda: crud._USER_BY_USERNAME,
+                lambda: rows(_user_by_username(name)),
+                lambda: crud.get_user_by_username(db, name),
+            ),
+            "get_book": (
+                lambda: _book(42),
+                lambda: crud._BOOK_BY_ID,
+                lambda: rows(_book(42)),
+                lambda: crud.get_book(db, 42),
+            ),
+            "get_book_rows author_id+available": (
+                lambda: _books(7, True, 20),
+                lambda: crud._book_list_statement(
+                    columns, "sqlite", None, crud._book_list_params(0, 20, None, 7, True, None, None)
+                ),
+                lambda: rows(_books(7, True, 20)),
+                lambda: crud.get_book_rows(db, columns, limit=20, author_id=7, available=True),
+            ),
+            "get_borrow_history cursor": (
+                lambda: _history(1, (last.borrowed_at, last.id), 10),
+                lambda: crud._cached(
+                    ("history", frozenset(history_params)), lambda: crud._history_statement(history_params)
+                ),
+                lambda: rows(_history(1, (last.borrowed_at, last.id), 10)),
+                lambda: crud.get_borrow_history(db, user_id=1, limit=10, cursor=cursor),
+            ),
+        }
+        for label, (rebuilt_prep, cached_prep, rebuilt_call, cached_call) in cases.items():
+            # Warm the compiled cache for both variants before timing
+            await rebuilt_call()
+            await cached_call()
+            rebuilt, cached = [], []
+            for _ in range(args.rounds):  # alternate so drift hits both alike
+                rebuilt.append(await _call_us(rebuilt_call, args.calls // args.rounds))
+                cached.append(await _call_us(cached_call, args.calls // args.rounds))
+                db.expunge_all()
+            rebuilt_us, cached_us = sum(rebuilt) / len(rebuilt), sum(cached) / len(cached)
+            results[label] = {
+                "prep_us": {
+                    "rebuilt": round(_prep_us(rebuilt_prep, args.calls), 2),
+                    "cached": round(_prep_us(cached_prep, args.calls), 2),
+                },
+                "call_us": {"rebuilt": round(rebuilt_us, 1), "cached": round(cached_us, 1)},
+                "saving": f"{(rebuilt_us - cached_us) / rebuilt_us * 100:.1f}%",
+            }
+    return {"benchmark": "statement_cache", "calls": args.calls, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
@@ -0,0 +1,153 @@
+"""Initial schema: everything `create_all` built before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created by the old startup `create_all` match this revision,
+except that ones built before overdue tracking lack a column that 0005 adds:
+run `alembic stamp 0001` on them once, then `alembic upgrade head`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# SQLite: external-content FTS5 table kept in sync with `books` by triggers
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, description, content='books', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, description ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "authors",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("birth_date", sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_authors_id", "authors", ["id"])
+
+    op.create_table(
+        "books",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("isbn", sa.String(), nullable=True),
+        sa.Column("published_date", sa.Date(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("available", sa.Boolean(), nullable=True),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["author_id"], ["authors.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_books_id", "books", ["id"])
+    op.create_index("ix_books_isbn", "books", ["isbn"], unique=True)
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_books_search_vector ON books USING gin ("
+            "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')))"
+        )
+        op.create_index(
+            "ix_books_title_trgm", "books", ["title"],
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+        )
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+    op.create_table(
+        "borrow_records",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("borrowed_at", sa.DateTime(), nullable=True),
+        sa.Column("due_date", sa.DateTime(), nullable=False),
+        sa.Column("returned_at", sa.DateTime(), nullable=True),
+        sa.Column("overdue_flagged_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_borrow_records_id", "borrow_records", ["id"])
+    open_loans = sa.text("returned_at IS NULL")
+    unflagged = sa.text("returned_at IS NULL AND overdue_flagged_at IS NULL")
+    op.create_index(
+        "ix_borrow_records_open_due", "borrow_records", ["due_date"],
+        postgresql_where=open_loans, sqlite_where=open_loans,
+    )
+    op.create_index(
+        "ix_borrow_records_unflagged_due", "borrow_records", ["due_date"],
+        postgresql_where=unflagged, sqlite_where=unflagged,
+    )
+
+    op.create_table(
+        "catalog_counters",
+        sa.Column("slot", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("books", sa.Integer(), nullable=False),
+        sa.Column("available_books", sa.Integer(), nullable=False),
+        sa.Column("active_loans", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("slot"),
+    )
+    op.create_table(
+        "author_book_counts",
+        sa.Column("author_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("books", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["author_id"], ["authors.id"]),
+        sa.PrimaryKeyConstraint("author_id"),
+    )
+    op.create_table(
+        "daily_loan_counts",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("slot", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("loans", sa.Integer(), nullable=False),
+        sa.Column("returns", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "slot"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_loan_counts")
+    op.drop_table("author_book_counts")
+    op.drop_table("catalog_counters")
+    op.drop_table("borrow_records")
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS books_fts")
+    op.drop_table("books")
+    op.drop_table("authors")
+    op.drop_table("users")
@@ -0,0 +1,41 @@
+"""Composite indexes for the hot crud.py access paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+On Postgres the indexes are built CONCURRENTLY, so books and borrow_records
+stay writable while this runs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_books_author_available", "books", [sa.column("author_id"), sa.column("available"), sa.column("id")]),
+    (
+        "ix_borrow_records_user_borrowed", "borrow_records",
+        [sa.column("user_id"), sa.text("borrowed_at DESC"), sa.text("id DESC")],
+    ),
+    ("ix_borrow_records_book_id", "borrow_records", [sa.column("book_id")]),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
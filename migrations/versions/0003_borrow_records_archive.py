@@ -0,0 +1,58 @@
+"""Archive table for returned loans, and the index the archiver selects by
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+On Postgres the archive is range-partitioned by borrowed_at; app/archive.py
+creates the yearly partitions before moving rows into them. The hot-table
+index is built CONCURRENTLY, as in 0002.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+RETURNED = sa.text("returned_at IS NOT NULL")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "borrow_records_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("borrowed_at", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("due_date", sa.DateTime(), nullable=False),
+        sa.Column("returned_at", sa.DateTime(), nullable=False),
+        sa.Column("overdue_flagged_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "borrowed_at"),
+        postgresql_partition_by="RANGE (borrowed_at)",
+    )
+    op.create_index(
+        "ix_borrow_records_archive_user_borrowed", "borrow_records_archive",
+        [sa.column("user_id"), sa.text("borrowed_at DESC"), sa.text("id DESC")],
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_borrow_records_returned_at", "borrow_records", ["returned_at"],
+                postgresql_where=RETURNED, postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index(
+            "ix_borrow_records_returned_at", "borrow_records", ["returned_at"],
+            sqlite_where=RETURNED, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_borrow_records_returned_at", table_name="borrow_records")
+    # Loans still in the archive go with it; move them back first if they matter
+    op.drop_table("borrow_records_archive")
@@ -0,0 +1,50 @@
+"""Add borrow_records.overdue_flagged_at where create_all never did
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Overdue tracking added the column and two partial indexes to an existing
+table, which the old startup `create_all` does not alter. Databases it
+built before then were stamped 0001 without them, and every borrow_records
+query fails there. This adds whatever is missing and does nothing on
+databases that already match 0001.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+OPEN = sa.text("returned_at IS NULL")
+UNFLAGGED = sa.text("returned_at IS NULL AND overdue_flagged_at IS NULL")
+INDEXES = [
+    ("ix_borrow_records_open_due", OPEN),
+    ("ix_borrow_records_unflagged_due", UNFLAGGED),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(bind).get_columns("borrow_records")}
+    if "overdue_flagged_at" not in columns:
+        op.add_column("borrow_records", sa.Column("overdue_flagged_at", sa.DateTime(), nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, where in INDEXES:
+                op.create_index(
+                    name, "borrow_records", ["due_date"],
+                    postgresql_where=where, postgresql_concurrently=True, if_not_exists=True,
+                )
+    else:
+        for name, where in INDEXES:
+            op.create_index(name, "borrow_records", ["due_date"], sqlite_where=where, if_not_exists=True)
+
+
+def downgrade() -> None:
+    # Nothing to undo: 0001 already declares the column and indexes
+    pass
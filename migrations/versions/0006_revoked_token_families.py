@@ -0,0 +1,32 @@
+"""Revoked refresh token families
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+One row per logged-out session, or per session whose refresh token was
+reused, until every token it can hold has expired; see app/revocation.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_token_families",
+        sa.Column("family", sa.String(length=32), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("family"),
+    )
+    op.create_index("ix_revoked_token_families_expires_at", "revoked_token_families", ["expires_at"])
+
+
+def downgrade() -> None:
+    # Dropping it makes logged-out and compromised sessions usable again
+    op.drop_index("ix_revoked_token_families_expires_at", table_name="revoked_token_families")
+    op.drop_table("revoked_token_families")